@@ -0,0 +1,118 @@
+"""
+Mutual Fund FAQ Assistant - Admission Control
+Per-client token buckets and a global concurrency limit that shed load before it queues.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+# Past this many clients, the least recently seen one is forgotten.
+MAX_CLIENTS = 10000
+
+
+class Rejection(NamedTuple):
+    """Why a request was shed, its HTTP status and the Retry-After seconds."""
+    reason: str
+    status: int
+    retry_after: int
+
+
+class AdmissionController:
+    """Decides, before any work is done, whether a request is served.
+
+    Each client (by address) has a token bucket refilled at ``rate``
+    requests per second up to ``burst``; a request without a token gets
+    429 with the wait until the next one. Admitted requests then need one
+    of ``max_concurrent`` slots. When every slot is busy, the expected
+    queueing delay (requests already waiting times the average service
+    time, over the slots) is compared with ``max_queue_delay``: past it
+    the request gets 503 at once; otherwise it waits for a slot at most
+    that long. Waiting is thus bounded, so the latency of admitted
+    requests stays near their service time however much traffic arrives.
+
+    Slots only bound waiting that happens inside the process: under a
+    threaded server there must be more threads than slots, and under an
+    event loop, which runs one handler at a time, they never fill up.
+    There the server passes the time a request already queued before its
+    handler started (such as the event loop's lag) to :meth:`admit`, which
+    sheds it with 503 once that is past ``max_queue_delay``.
+
+    ``rate`` or ``max_concurrent`` of 0 turns that part off.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 20.0, max_concurrent: int = 0,
+                 max_queue_delay: float = 0.05):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_concurrent = max_concurrent
+        self.max_queue_delay = max_queue_delay
+        self.in_flight = 0
+        self.waiting = 0
+        # client -> [tokens, time of the last refill], least recently seen first
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._bucket_lock = threading.Lock()
+        self._slots = threading.Semaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        # Moving average of the time a request holds a slot.
+        self._service_time = 0.001
+
+    def _take_token(self, client: str, now: float) -> Optional[Rejection]:
+        with self._bucket_lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= MAX_CLIENTS:
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[client] = [self.burst, now]
+            else:
+                self._buckets.move_to_end(client)
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return None
+            bucket[0] = tokens
+        return Rejection("rate_limited", 429, math.ceil((1 - tokens) / self.rate))
+
+    def admit(self, client: str, queued: float = 0.0) -> Optional[Rejection]:
+        """Reserve a slot for a request from ``client`` that has already
+        queued ``queued`` seconds, or say why it is shed.
+
+        Every admitted request must be followed by :meth:`release`.
+        """
+        now = time.monotonic()
+        if self.rate > 0:
+            rejection = self._take_token(client, now)
+            if rejection:
+                return rejection
+        if self._slots is None:
+            return None
+        if queued > self.max_queue_delay:
+            return Rejection("overloaded", 503, 1)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                expected_delay = (self.waiting + 1) * self._service_time / self.max_concurrent
+                if expected_delay > self.max_queue_delay:
+                    return Rejection("overloaded", 503, 1)
+                self.waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.max_queue_delay)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                return Rejection("overloaded", 503, 1)
+        with self._lock:
+            self.in_flight += 1
+        return None
+
+    def release(self, service_time: float):
+        """Free the slot of a request that took ``service_time`` seconds."""
+        if self._slots is None:
+            return
+        with self._lock:
+            self.in_flight -= 1
+            self._service_time += 0.05 * (service_time - self._service_time)
+        self._slots.release()
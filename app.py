@@ -4,230 +4,671 @@ Mutual Fund FAQ Assistant - Web Application
 Flask backend with modern minimalist UI
 """
 
-from flask import Flask, render_template, jsonify, request
+import logging
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from flask import Flask, g, render_template, request
+
+from admission import AdmissionController
+from batch_search import get_batch_scorer, search_batch
+from client_index import build_client_index
+from corpus import CORPUS_PATH, CorpusWatcher, FileWatcher
+from faq_index import POPULAR_TOPICS, FAQIndex, FAQRecord, current_index, normalize, swap_index
+from metrics import Counter, Gauge, Histogram, render
+from nav import get_nav_store, watch_nav_store
+from payloads import DEFAULT_CACHE_CONTROL, Payload, build_payload, negotiate
+from profiling import ProfileSampler, profile_call, summarize
+from ranking import MAX_TOP_K, get_ranker, rank
+from result_cache import ResultCache, SharedResultCache
+from schemes import get_scheme_resolver, watch_scheme_master
+from semantic import get_semantic_index, match_with_fallback, semantic_match, semantic_rank
+from suggest import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, get_suggester
 
 app = Flask(__name__)
+app.config.update(
+    SEARCH_CACHE_SIZE=4096,
+    SEARCH_CACHE_PATH="",
+    SEARCH_CACHE_TTL=3600.0,
+    FAQ_CACHE_CONTROL=DEFAULT_CACHE_CONTROL,
+    PROFILING=False,
+    PROFILE_SAMPLE_RATE=0.0,
+    PROFILE_DIR="profiles",
+    CORPUS_POLL_INTERVAL=2.0,
+    DATA_POLL_INTERVAL=1.0,
+    CLIENT_INDEX_MAX_BYTES=256 * 1024,
+    CLIENT_ANSWERS_MAX_BYTES=1024 * 1024,
+    ADMISSION_RATE=0.0,
+    ADMISSION_BURST=20.0,
+    ADMISSION_MAX_CONCURRENT=0,
+    ADMISSION_MAX_QUEUE_DELAY=0.05,
+    ADMISSION_CLIENT_HEADER="",
+    ADMISSION_TRUSTED_PROXIES=1
+)
+app.config.from_prefixed_env("MF_FAQ")
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 10000
+
+SEARCH_MODES = ("keyword", "semantic")
+DEFAULT_SEMANTIC_K = 5
+
+# Client search indexes are addressed by corpus version, so they never change.
+CLIENT_INDEX_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Gzipped client indexes take 6-10 bytes per (FAQ, keyword) pair; below this
+# many a corpus is too large without building its index to find out.
+CLIENT_INDEX_MIN_BYTES_PER_KEYWORD = 4
+
+# The popular-topic chips, which dominate traffic.
+WARM_UP_QUERIES = tuple(query for _, query in POPULAR_TOPICS)
+
+ResponseTuple = Tuple[bytes, int, List[Tuple[str, str]]]
+
+# With SEARCH_CACHE_PATH set, all workers on the host share one SQLite cache.
+if app.config["SEARCH_CACHE_PATH"]:
+    search_cache = SharedResultCache(app.config["SEARCH_CACHE_PATH"], app.config["SEARCH_CACHE_SIZE"],
+                                     app.config["SEARCH_CACHE_TTL"])
+else:
+    search_cache = ResultCache(app.config["SEARCH_CACHE_SIZE"])
+
+# Guards /api/search and /api/faq/<id>; the defaults admit everything.
+admission = AdmissionController(app.config["ADMISSION_RATE"], app.config["ADMISSION_BURST"],
+                                app.config["ADMISSION_MAX_CONCURRENT"], app.config["ADMISSION_MAX_QUEUE_DELAY"])
+
+profile_sampler = ProfileSampler(app.config["PROFILE_SAMPLE_RATE"], app.config["PROFILE_DIR"])
+
+_ready = threading.Event()
+
+_watchers: List[FileWatcher] = []
+
+# Metrics are per process; under gunicorn each worker is scraped separately.
+request_count = Counter("mf_faq_requests_total", "HTTP requests by route and status code.",
+                        ("route", "status"))
+request_latency = Histogram("mf_faq_request_duration_seconds", "HTTP request latency by route.",
+                            ("route",))
+match_score = Histogram("mf_faq_search_match_score", "Keyword score of the FAQ returned by /api/search.",
+                        buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+search_results = Counter("mf_faq_search_results_total", "/api/search requests by whether an FAQ was found.",
+                         ("found",))
+shed_requests = Counter("mf_faq_shed_requests_total", "Requests rejected by admission control by route and reason.",
+                        ("route", "reason"))
+matched_faqs = Counter("mf_faq_search_matched_faq_total",
+                       "/api/search requests answered by each popular-topic FAQ, and by any other FAQ.",
+                       ("faq_id",))
+METRICS = (
+    request_count,
+    request_latency,
+    match_score,
+    search_results,
+    matched_faqs,
+    shed_requests,
+    Gauge("mf_faq_admission_in_flight", "Admitted requests being served.", lambda: admission.in_flight),
+    Gauge("mf_faq_admission_waiting", "Requests waiting for a concurrency slot.", lambda: admission.waiting),
+    Gauge("mf_faq_search_cache_hits_total", "Search result cache hits.",
+          lambda: search_cache.hits, "counter"),
+    Gauge("mf_faq_search_cache_misses_total", "Search result cache misses.",
+          lambda: search_cache.misses, "counter"),
+    Gauge("mf_faq_search_cache_evictions_total", "Search result cache evictions.",
+          lambda: search_cache.evictions, "counter"),
+    Gauge("mf_faq_search_cache_hit_ratio", "Share of search cache lookups that hit.",
+          lambda: search_cache.stats()["hit_ratio"]),
+    Gauge("mf_faq_search_cache_entries", "Responses held in the search result cache.",
+          lambda: len(search_cache)),
+)
+
+
+def _faq_payload(faq: FAQRecord) -> dict:
+    return {
+        "found": True,
+        "question": faq.question,
+        "answer": faq.answer,
+        "source": faq.source,
+        "source_name": faq.source_name
+    }
+
+
+def _json_body(payload) -> bytes:
+    """Serialize a payload exactly as ``jsonify`` would."""
+    return (app.json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+# Per-FAQ payloads of the latest corpus version, reused for unchanged FAQs on reload.
+_record_payloads: Dict[FAQRecord, Payload] = {}
+
+
+@lru_cache(maxsize=4096)
+def _mapped_faq_payload(faq: FAQRecord) -> Payload:
+    return build_payload(_json_body(_faq_payload(faq)), cache_control=app.config["FAQ_CACHE_CONTROL"])
 
-FAQ_DATABASE = [
-    {
-        "id": 1,
-        "keywords": ["expense ratio", "expense", "ter", "total expense ratio", "fees", "charges"],
-        "question": "What is expense ratio in mutual funds?",
-        "answer": """Expense Ratio (Total Expense Ratio - TER) is the annual fee charged by mutual funds to manage your investments. It includes fund management fees, administrative costs, and distribution expenses. SEBI has capped the maximum TER based on AUM:
-        
-• Equity schemes: 2.25% for first ₹500 crore, reducing progressively
-• Debt schemes: 2.00% for first ₹500 crore, reducing progressively
-• Index funds/ETFs: Maximum 1.00%
-
-The expense ratio is deducted daily from the fund's NAV.""",
-        "source": "https://www.sebi.gov.in/legal/circulars/sep-2018/circular-on-total-expense-ratio-ter-and-performance-disclosure-for-mutual-funds_40456.html",
-        "source_name": "SEBI Circular"
-    },
-    {
-        "id": 2,
-        "keywords": ["exit load", "exit", "redemption charge", "withdrawal charge", "sell"],
-        "question": "What is exit load in mutual funds?",
-        "answer": """Exit load is a fee charged when you redeem (sell) mutual fund units before a specified period. Common exit load structures:
-
-• Equity funds: Typically 1% if redeemed within 1 year
-• Liquid funds: Usually nil or graded (up to 7 days)
-• ELSS funds: No exit load (but 3-year lock-in applies)
-• Overnight funds: Nil
-
-Exit load is deducted from the redemption NAV. Always check the Scheme Information Document (SID) for exact exit load details.""",
-        "source": "https://www.amfiindia.com/investor-corner/knowledge-center/exit-load.html",
-        "source_name": "AMFI India"
-    },
-    {
-        "id": 3,
-        "keywords": ["minimum sip", "sip amount", "sip minimum", "systematic investment", "monthly investment"],
-        "question": "What is the minimum SIP amount?",
-        "answer": """Minimum SIP (Systematic Investment Plan) amounts vary by fund house and scheme:
-
-• Most funds: ₹500 per month minimum
-• Some funds: ₹100 per month (micro-SIP)
-• Premium/specialized funds: ₹1,000 - ₹5,000
-
-SIP frequency options include monthly, weekly, daily, or quarterly. Check the specific scheme's SID or the AMC website for exact minimum amounts.""",
-        "source": "https://www.amfiindia.com/investor-corner/knowledge-center/sip.html",
-        "source_name": "AMFI India"
-    },
-    {
-        "id": 4,
-        "keywords": ["lock-in", "lockin", "elss", "tax saving", "80c", "tax benefit"],
-        "question": "What is the lock-in period for ELSS funds?",
-        "answer": """ELSS (Equity Linked Savings Scheme) has a mandatory lock-in period of 3 years from the date of each investment. Key points:
-
-• Lock-in: 3 years (shortest among Section 80C instruments)
-• Tax benefit: Up to ₹1.5 lakh deduction under Section 80C
-• Each SIP installment has its own 3-year lock-in
-• No premature withdrawal allowed during lock-in
-• After lock-in, units can be redeemed freely (no exit load)
-
-LTCG tax applies: 12.5% on gains exceeding ₹1.25 lakh per year.""",
-        "source": "https://www.amfiindia.com/investor-corner/knowledge-center/tax-planning-through-elss.html",
-        "source_name": "AMFI India"
-    },
-    {
-        "id": 5,
-        "keywords": ["riskometer", "risk", "risk level", "risk category", "risk meter"],
-        "question": "What is a riskometer in mutual funds?",
-        "answer": """Riskometer is a visual risk indicator mandated by SEBI that shows a mutual fund's risk level. It has 6 categories:
-
-1. Low - Principal at low risk (liquid, overnight funds)
-2. Low to Moderate - Principal at low to moderate risk
-3. Moderate - Principal at moderate risk
-4. Moderately High - Principal at moderately high risk
-5. High - Principal at high risk (equity funds)
-6. Very High - Principal at very high risk (sectoral, thematic funds)
-
-The riskometer must be displayed in all scheme documents and advertisements. It is reviewed monthly.""",
-        "source": "https://www.sebi.gov.in/legal/circulars/oct-2020/circular-on-product-labeling-in-mutual-funds-riskometer_47796.html",
-        "source_name": "SEBI Circular"
-    },
-    {
-        "id": 6,
-        "keywords": ["benchmark", "index", "comparison", "nifty", "sensex", "performance"],
-        "question": "What is a benchmark in mutual funds?",
-        "answer": """A benchmark is a standard index against which a mutual fund's performance is measured. Common benchmarks:
-
-• Large cap funds: Nifty 50, BSE Sensex
-• Mid cap funds: Nifty Midcap 150
-• Small cap funds: Nifty Smallcap 250
-• Flexi cap funds: Nifty 500
-• Debt funds: CRISIL indices, Nifty bond indices
-
-SEBI mandates funds to declare a Tier 1 benchmark (broad market index) and optionally a Tier 2 benchmark. Performance comparison with benchmark must be shown in factsheets.""",
-        "source": "https://www.sebi.gov.in/legal/circulars/jan-2022/circular-on-benchmarking-of-scheme-s-performance-to-total-return-index_55270.html",
-        "source_name": "SEBI Circular"
-    },
-    {
-        "id": 7,
-        "keywords": ["statement", "download", "cas", "account statement", "portfolio", "holdings"],
-        "question": "How do I download my mutual fund statement?",
-        "answer": """You can download your Consolidated Account Statement (CAS) through these official methods:
-
-1. CAMS/KFintech - Visit the registrar's website
-2. MF Central (AMFI portal) - Single source for all funds
-3. Individual AMC websites - Login to your folio
-4. Email request - Send email to cams@camsonline.com or mfs@kfintech.com with PAN
-
-MF Central is recommended as it provides a single consolidated view of all your mutual fund holdings across all AMCs.""",
-        "source": "https://www.mfcentral.com/",
-        "source_name": "MF Central"
-    },
-    {
-        "id": 8,
-        "keywords": ["nav", "net asset value", "price", "unit price", "value"],
-        "question": "What is NAV in mutual funds?",
-        "answer": """NAV (Net Asset Value) is the per-unit market value of a mutual fund scheme. It is calculated as:
-
-NAV = (Total Assets - Total Liabilities) / Number of Units Outstanding
-
-Key points:
-• NAV is declared daily (except holidays)
-• Cut-off time: 3 PM for equity funds, 1:30 PM for liquid funds
-• NAV is published on AMFI website by 11 PM daily
-• Purchase/redemption happens at applicable NAV based on cut-off time""",
-        "source": "https://www.amfiindia.com/nav-history-download",
-        "source_name": "AMFI India"
-    },
-    {
-        "id": 9,
-        "keywords": ["kyc", "know your customer", "verification", "pan", "documents"],
-        "question": "What is KYC for mutual funds?",
-        "answer": """KYC (Know Your Customer) is a one-time verification mandatory for mutual fund investments. Requirements:
-
-• PAN card (mandatory)
-• Address proof (Aadhaar, passport, etc.)
-• Photograph
-• In-Person Verification (IPV)
-
-You can complete KYC through:
-1. KRA agencies (CAMS KRA, KFintech, CVL)
-2. Online eKYC using Aadhaar
-3. Through AMC or distributor
-
-Once KYC is done with one KRA, it's valid across all mutual funds.""",
-        "source": "https://www.camskra.com/",
-        "source_name": "CAMS KRA"
-    },
-    {
-        "id": 10,
-        "keywords": ["aum", "assets under management", "fund size", "corpus"],
-        "question": "What is AUM in mutual funds?",
-        "answer": """AUM (Assets Under Management) is the total market value of all investments managed by a mutual fund scheme. Key points:
-
-• Higher AUM generally indicates investor confidence
-• Very large AUM in small/mid cap funds may impact performance
-• AUM affects expense ratio (larger funds have lower TER)
-• Industry AUM data is published monthly by AMFI
-
-Check the monthly AMFI data for scheme-wise and AMC-wise AUM figures.""",
-        "source": "https://www.amfiindia.com/research-information/aum-data",
-        "source_name": "AMFI India"
+
+class _OnDemandPayloads:
+    """/api/faq/<id> payloads of a mapped corpus, built when first requested.
+
+    Prebuilding them would decode every answer into each worker's memory.
+    """
+
+    def __init__(self, index: FAQIndex):
+        self._index = index
+
+    def get(self, faq_id: int) -> Optional[Payload]:
+        faq = self._index.get(faq_id)
+        return _mapped_faq_payload(faq) if faq else None
+
+
+@lru_cache(maxsize=2)
+def _faq_payloads(index: FAQIndex):
+    """Prebuilt /api/faqs and /api/faq/<id> payloads for an index."""
+    global _record_payloads
+    cache_control = app.config["FAQ_CACHE_CONTROL"]
+    all_faqs = build_payload(_json_body([{
+        "id": faq.id,
+        "question": faq.question
+    } for faq in index]), cache_control=cache_control)
+    if index.mapped:
+        return all_faqs, _OnDemandPayloads(index)
+    previous = _record_payloads
+    _record_payloads = {
+        faq: previous.get(faq) or build_payload(_json_body(_faq_payload(faq)), cache_control=cache_control)
+        for faq in index
     }
-]
+    by_id = MappingProxyType({faq.id: _record_payloads[faq] for faq in index})
+    return all_faqs, by_id
+
+
+@lru_cache(maxsize=2)
+def _client_index(index: FAQIndex) -> Optional[Payload]:
+    """The browser search index for ``index``, or None if its gzipped size exceeds ``CLIENT_INDEX_MAX_BYTES``."""
+    keywords = sum(len(faq.keywords) for faq in index)
+    if keywords * CLIENT_INDEX_MIN_BYTES_PER_KEYWORD > app.config["CLIENT_INDEX_MAX_BYTES"]:
+        return None
+    payload = build_payload(_json_body(build_client_index(index)), cache_control=CLIENT_INDEX_CACHE_CONTROL)
+    if len(payload.gzip) > app.config["CLIENT_INDEX_MAX_BYTES"]:
+        return None
+    return payload
+
+
+@lru_cache(maxsize=2)
+def _client_answers(index: FAQIndex) -> Optional[Payload]:
+    """Every answer of ``index`` for the browser to show its own matches, or None
+    without a client index or if its gzipped size exceeds ``CLIENT_ANSWERS_MAX_BYTES``."""
+    if _client_index(index) is None:
+        return None
+    payload = build_payload(_json_body({
+        "version": index.version,
+        "ids": [faq.id for faq in index],
+        "answers": [_faq_payload(faq) for faq in index]
+    }), cache_control=CLIENT_INDEX_CACHE_CONTROL)
+    if len(payload.gzip) > app.config["CLIENT_ANSWERS_MAX_BYTES"]:
+        return None
+    return payload
+
+
+def _json_response(payload, status: int = 200) -> ResponseTuple:
+    return _json_body(payload), status, [("Content-Type", "application/json")]
+
+
+def _payload_response(payload: Payload, accept_encoding: str, if_none_match: str) -> ResponseTuple:
+    status, headers, body = negotiate(payload, accept_encoding, if_none_match)
+    return body, status, headers
+
+
+def observe_request(route: str, status: int, seconds: float):
+    """Record one served request; ``route`` is the URL rule, e.g. ``/api/faq/<int:faq_id>``."""
+    request_count.inc((route, str(status)))
+    request_latency.observe(seconds, (route,))
+
+
+@lru_cache(maxsize=2)
+def _labelled_faq_ids(index: FAQIndex) -> FrozenSet[int]:
+    """FAQs counted under their own id in ``matched_faqs``: those answering the popular topics.
+
+    Every other FAQ is counted as ``other``, so the metric has a bounded
+    number of series however large the corpus is.
+    """
+    return frozenset(faq.id for faq in map(index.search, WARM_UP_QUERIES) if faq)
+
+
+def _observe_search(index: FAQIndex, faq_id: Optional[int], score: Optional[int]):
+    if faq_id is None:
+        search_results.inc(("false",))
+        return
+    search_results.inc(("true",))
+    matched_faqs.inc((str(faq_id) if faq_id in _labelled_faq_ids(index) else "other",))
+    if score is not None:
+        match_score.observe(score)
+
+
+_faq_payloads(current_index())
+
+
+def _prepare(index: FAQIndex, prime_cache: bool):
+    """Build everything the handlers lazily need for ``index``."""
+    _faq_payloads(index)
+    _client_index(index)
+    _client_answers(index)
+    _index_page(index)
+    _labelled_faq_ids(index)
+    get_batch_scorer(index)
+    get_ranker(index)
+    get_suggester(index)
+    get_semantic_index(index)
+    index.fuzzy_matcher()
+    for query in WARM_UP_QUERIES:
+        _search_entry(index, normalize(query), None, use_cache=prime_cache)
+    search_batch(index, WARM_UP_QUERIES)
+    rank(index, WARM_UP_QUERIES[0])
+
+
+def warm_up():
+    """Build every lazily built structure and prime the hot paths.
+
+    Run once before accepting traffic; under gunicorn this happens in the
+    master so forked workers share the result copy-on-write.
+    """
+    _prepare(current_index(), prime_cache=True)
+    _ready.set()
+
+
+def reload_corpus(faqs: Sequence[dict]):
+    """Index a new corpus version and switch to it once it is fully prepared.
+
+    Requests keep using the previous index until the swap, and the swap is
+    a single reference assignment.
+    """
+    old = current_index()
+    start = time.perf_counter()
+    index = old.updated(faqs)
+    if index is old:
+        return
+    # Priming the result cache now would evict the version still being served.
+    _prepare(index, prime_cache=False)
+    swap_index(index)
+    logger.info("FAQ corpus %s -> %s (%d FAQs) in %.3fs",
+                old.version, index.version, len(index), time.perf_counter() - start)
+
+
+def start_watchers():
+    """Load the scheme master and NAV store, and keep them and the corpus current
+    by polling their files in background threads (once per process)."""
+    if _watchers:
+        return
+    interval = app.config["CORPUS_POLL_INTERVAL"]
+    if interval > 0:
+        _watchers.append(CorpusWatcher(reload_corpus, CORPUS_PATH, interval))
+        _watchers[-1].start()
+    # With polling off these are loaded once and never reloaded.
+    data_interval = app.config["DATA_POLL_INTERVAL"] if interval > 0 else 0
+    _watchers.append(watch_scheme_master(interval=data_interval))
+    _watchers.append(watch_nav_store(interval=data_interval))
+
+
+# Request-independent handlers returning (body, status, headers). Flask
+# views return them as-is and asgi_app.py sends them, so both serving
+# modes produce identical responses.
+
+@lru_cache(maxsize=2)
+def _index_page(index: FAQIndex) -> Payload:
+    """The home page with the popular-topic answers embedded; it loads the question list from /api/faqs."""
+    topics = []
+    for label, query in POPULAR_TOPICS:
+        faq = index.search(query)
+        topics.append({
+            "label": label,
+            "query": query,
+            "answer": _faq_payload(faq) if faq else {"found": False}
+        })
+    search_index_url = f"/api/search-index/{index.version}" if _client_index(index) else ""
+    answers_url = f"/api/answers/{index.version}" if _client_answers(index) else ""
+    with app.app_context():
+        html = render_template('index.html', topics=topics, search_index_url=search_index_url,
+                               answers_url=answers_url)
+    # Revalidated on every visit so a corpus reload shows up at once.
+    return build_payload(html.encode("utf-8"), "text/html; charset=utf-8", "no-cache")
+
+
+def index_response(accept_encoding: str = "", if_none_match: str = "") -> ResponseTuple:
+    return _payload_response(_index_page(current_index()), accept_encoding, if_none_match)
+
+
+def faqs_response(accept_encoding: str = "", if_none_match: str = "") -> ResponseTuple:
+    all_faqs, _ = _faq_payloads(current_index())
+    return _payload_response(all_faqs, accept_encoding, if_none_match)
+
+
+def client_index_response(version: str, accept_encoding: str = "", if_none_match: str = "") -> ResponseTuple:
+    """The current client search index; 404 for other versions or when it is too large."""
+    index = current_index()
+    payload = _client_index(index) if version == index.version else None
+    if payload is None:
+        return _json_response({"found": False}, 404)
+    return _payload_response(payload, accept_encoding, if_none_match)
+
+
+def client_answers_response(version: str, accept_encoding: str = "", if_none_match: str = "") -> ResponseTuple:
+    """The current client answer bundle; 404 for other versions or when it is not offered."""
+    index = current_index()
+    payload = _client_answers(index) if version == index.version else None
+    if payload is None:
+        return _json_response({"found": False}, 404)
+    return _payload_response(payload, accept_encoding, if_none_match)
+
+
+def client_id(remote_addr: str, headers: Mapping[str, str]) -> str:
+    """The client admission control rate-limits: its address, or behind proxies the
+    address ``ADMISSION_TRUSTED_PROXIES`` entries from the end of
+    ``ADMISSION_CLIENT_HEADER`` (e.g. X-Forwarded-For).
+
+    Each proxy appends the address it received the request from, so only
+    the last entries are trustworthy; anything before them is whatever the
+    client sent.
+    """
+    header = app.config["ADMISSION_CLIENT_HEADER"]
+    if not header:
+        return remote_addr
+    addresses = [address.strip() for address in headers.get(header.lower(), "").split(",")]
+    addresses = [address for address in addresses if address]
+    trusted = max(int(app.config["ADMISSION_TRUSTED_PROXIES"]), 1)
+    if len(addresses) < trusted:
+        return remote_addr
+    return addresses[-trusted]
+
+
+def admitted_response(client: str, route: str, handler: Callable[..., ResponseTuple], *args,
+                      queued: float = 0.0) -> ResponseTuple:
+    """``handler(*args)`` if admission control lets the request in, else a fast 429/503.
+
+    ``queued`` is how long the request already waited for the server to get to it.
+    """
+    rejection = admission.admit(client, queued)
+    if rejection:
+        shed_requests.inc((route, rejection.reason))
+        message = "Too many requests" if rejection.status == 429 else "Server is busy"
+        body, status, headers = _json_response({"error": f"{message}, retry later"}, rejection.status)
+        return body, status, headers + [("Retry-After", str(rejection.retry_after))]
+    start = time.perf_counter()
+    try:
+        return handler(*args)
+    finally:
+        admission.release(time.perf_counter() - start)
+
+
+def search_response(args: Mapping[str, str], use_cache: bool = True) -> ResponseTuple:
+    query = normalize(args.get('q', ''))
+    
+    if not query:
+        return _json_response({"error": "No query provided"}, 400)
+    
+    k = None
+    if 'k' in args:
+        try:
+            k = int(args['k'])
+        except ValueError:
+            pass
+        if k is None or not 1 <= k <= MAX_TOP_K:
+            return _json_response({"error": f"k must be an integer between 1 and {MAX_TOP_K}"}, 400)
+    
+    mode = args.get('mode', 'keyword')
+    if mode not in SEARCH_MODES:
+        return _json_response({"error": f"mode must be one of {', '.join(SEARCH_MODES)}"}, 400)
+    if mode == 'semantic' and k is None:
+        k = DEFAULT_SEMANTIC_K
+    
+    index = current_index()
+    body, faq_id, score = _search_entry(index, query, k, use_cache, mode)
+    _observe_search(index, faq_id, score)
+    return body, 200, [("Content-Type", "application/json")]
+
+
+def suggest_response(args: Mapping[str, str]) -> ResponseTuple:
+    limit = DEFAULT_SUGGESTIONS
+    if 'limit' in args:
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_SUGGESTIONS:
+            return _json_response({"error": f"limit must be an integer between 1 and {MAX_SUGGESTIONS}"}, 400)
+
+    suggestions = get_suggester(current_index()).suggest(args.get('prefix', ''), limit)
+    return _json_response({"suggestions": [
+        {"text": suggestion.text, "id": suggestion.faq_id} for suggestion in suggestions
+    ]})
+
+
+def nav_response(scheme_code: int, args: Mapping[str, str]) -> ResponseTuple:
+    """Latest NAV of a scheme, or its NAVs between the ``from`` and ``to`` dates."""
+    store = get_nav_store()
+    if store is None:
+        return _json_response({"error": "NAV data is not available"}, 503)
+    scheme = store.scheme(scheme_code)
+    if scheme is None:
+        return _json_response({"found": False}, 404)
+
+    payload = {
+        "found": True,
+        "scheme_code": scheme.code,
+        "scheme_name": scheme.name,
+        "category": scheme.category,
+        "fund_house": scheme.fund_house
+    }
+    if 'from' not in args and 'to' not in args:
+        day, nav = store.latest(scheme_code)
+        payload.update(date=day.isoformat(), nav=nav)
+        return _json_response(payload)
+
+    try:
+        start = date.fromisoformat(args['from']) if 'from' in args else None
+        end = date.fromisoformat(args['to']) if 'to' in args else None
+    except ValueError:
+        return _json_response({"error": "from and to must be dates as YYYY-MM-DD"}, 400)
+    payload["navs"] = [{"date": day.isoformat(), "nav": nav} for day, nav in store.history(scheme_code, start, end)]
+    return _json_response(payload)
+
+
+def profiled_search_response(args: Mapping[str, str], profile_header: str = "") -> ResponseTuple:
+    """/api/search with the opt-in profiling hooks.
+
+    With ``PROFILING`` on, ``X-Profile: 1`` or ``profile=1`` returns the
+    top functions of that request (run uncached) as text instead of the
+    answer. ``PROFILE_SAMPLE_RATE`` profiles a share of ordinary requests
+    into ``PROFILE_DIR``.
+    """
+    if app.config["PROFILING"] and "1" in (profile_header, args.get("profile")):
+        response, profiler = profile_call(search_response, args, use_cache=False)
+        if profiler is None:
+            return response
+        return summarize(profiler).encode("utf-8"), 200, [
+            ("Content-Type", "text/plain; charset=utf-8"),
+            ("X-Profiled-Status", str(response[1]))
+        ]
+    return profile_sampler.call(search_response, args)
+
+
+def _search_entry(index: FAQIndex, query: str, k: Optional[int], use_cache: bool = True,
+                  mode: str = "keyword") -> Tuple[bytes, Optional[int], Optional[int]]:
+    """Cached ``(body, matched FAQ id, keyword score)`` so cache hits still feed the metrics."""
+    if mode == "semantic":
+        cache_key = (query, k, mode)
+    else:
+        cache_key = query if k is None else (query, k)
+    resolver = get_scheme_resolver()
+    # Responses list the schemes a query names, so they also depend on the scheme master.
+    version = index.version if resolver is None else f"{index.version}+{resolver.version}"
+    entry = search_cache.get(version, cache_key) if use_cache else None
+    if entry is None:
+        if k is None:
+            best_match, score = match_with_fallback(index, query)
+            payload = _faq_payload(best_match) if best_match else {"found": False}
+            faq_id = best_match.id if best_match else None
+        else:
+            results = semantic_rank(index, query, k) if mode == "semantic" else rank(index, query, k)
+            payload = {
+                "found": bool(results),
+                "results": [{
+                    "id": faq.id,
+                    "question": faq.question,
+                    "answer": faq.answer,
+                    "source": faq.source,
+                    "source_name": faq.source_name,
+                    "score": round(score, 4)
+                } for faq, score in results]
+            }
+            faq_id, score = results[0][0].id if results else None, None
+        if resolver is not None:
+            payload["schemes"] = [{
+                "scheme_code": scheme.code,
+                "scheme_name": scheme.name,
+                "amc": scheme.amc,
+                "score": scheme.score
+            } for scheme in resolver.resolve(query)]
+        entry = _json_body(payload), faq_id, score
+        if use_cache:
+            search_cache.put(version, cache_key, entry)
+    return entry
+
+
+def ready_response() -> ResponseTuple:
+    if _ready.is_set():
+        return _json_response({"ready": True, "version": current_index().version})
+    return _json_response({"ready": False}, 503)
+
+
+def cache_stats_response() -> ResponseTuple:
+    return _json_response(search_cache.stats())
+
+
+def metrics_response() -> ResponseTuple:
+    return render(METRICS).encode("utf-8"), 200, [("Content-Type", "text/plain; version=0.0.4; charset=utf-8")]
+
+
+def search_batch_response(payload) -> ResponseTuple:
+    queries = payload.get("queries") if isinstance(payload, dict) else None
+    
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        return _json_response({"error": "Expected a JSON body like {\"queries\": [\"...\"]}"}, 400)
+    
+    if len(queries) > MAX_BATCH_SIZE:
+        return _json_response({"error": f"At most {MAX_BATCH_SIZE} queries per batch"}, 400)
+    
+    index = current_index()
+    # Keyword misses get the same semantic fallback as /api/search.
+    faqs = [faq or semantic_match(index, query) for faq, query in zip(search_batch(index, queries), queries)]
+    return _json_response({"results": [_faq_payload(faq) if faq else {"found": False} for faq in faqs]})
+
+
+def faq_response(faq_id: int, accept_encoding: str = "", if_none_match: str = "") -> ResponseTuple:
+    _, by_id = _faq_payloads(current_index())
+    payload = by_id.get(faq_id)
+    if payload:
+        return _payload_response(payload, accept_encoding, if_none_match)
+    return _json_response({"found": False}, 404)
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    observe_request(route, response.status_code, time.perf_counter() - g.request_start)
+    return response
 
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return index_response(
+        request.headers.get("Accept-Encoding", ""),
+        request.headers.get("If-None-Match", "")
+    )
 
 
 @app.route('/api/faqs')
 def get_all_faqs():
-    return jsonify([{
-        "id": faq["id"],
-        "question": faq["question"]
-    } for faq in FAQ_DATABASE])
+    return faqs_response(
+        request.headers.get("Accept-Encoding", ""),
+        request.headers.get("If-None-Match", "")
+    )
+
+
+@app.route('/api/search-index/<version>')
+def get_client_index(version):
+    return client_index_response(
+        version,
+        request.headers.get("Accept-Encoding", ""),
+        request.headers.get("If-None-Match", "")
+    )
+
+
+@app.route('/api/answers/<version>')
+def get_client_answers(version):
+    return client_answers_response(
+        version,
+        request.headers.get("Accept-Encoding", ""),
+        request.headers.get("If-None-Match", "")
+    )
 
 
 @app.route('/api/search')
 def search():
-    query = request.args.get('q', '').lower().strip()
-    
-    if not query:
-        return jsonify({"error": "No query provided"}), 400
-    
-    best_match = None
-    best_score = 0
-    
-    for faq in FAQ_DATABASE:
-        score = 0
-        for keyword in faq["keywords"]:
-            if keyword in query:
-                score += len(keyword)
-        
-        if score > best_score:
-            best_score = score
-            best_match = faq
-    
-    if best_match:
-        return jsonify({
-            "found": True,
-            "question": best_match["question"],
-            "answer": best_match["answer"],
-            "source": best_match["source"],
-            "source_name": best_match["source_name"]
-        })
-    
-    return jsonify({"found": False})
+    return admitted_response(
+        client_id(request.remote_addr or "", request.headers),
+        '/api/search',
+        profiled_search_response,
+        request.args,
+        request.headers.get("X-Profile", "")
+    )
+
+
+@app.route('/api/suggest')
+def suggest():
+    return suggest_response(request.args)
+
+
+@app.route('/api/nav/<int:scheme_code>')
+def get_nav(scheme_code):
+    return nav_response(scheme_code, request.args)
+
+
+@app.route('/readyz')
+def readyz():
+    return ready_response()
+
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    return cache_stats_response()
+
+
+@app.route('/metrics')
+def metrics():
+    return metrics_response()
+
+
+@app.route('/api/search/batch', methods=['POST'])
+def search_batch_endpoint():
+    return search_batch_response(request.get_json(silent=True))
 
 
 @app.route('/api/faq/<int:faq_id>')
 def get_faq(faq_id):
-    for faq in FAQ_DATABASE:
-        if faq["id"] == faq_id:
-            return jsonify({
-                "found": True,
-                "question": faq["question"],
-                "answer": faq["answer"],
-                "source": faq["source"],
-                "source_name": faq["source_name"]
-            })
-    return jsonify({"found": False}), 404
+    return admitted_response(
+        client_id(request.remote_addr or "", request.headers),
+        '/api/faq/<int:faq_id>',
+        faq_response,
+        faq_id,
+        request.headers.get("Accept-Encoding", ""),
+        request.headers.get("If-None-Match", "")
+    )
 
 
 if __name__ == '__main__':
+    warm_up()
+    start_watchers()
     app.run(debug=True, port=5001)
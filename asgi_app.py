@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Mutual Fund FAQ Assistant - ASGI Application
+Non-blocking serving mode for the web API, sharing its handlers with the Flask app.
+
+    uvicorn asgi_app:app --port 5001
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+from app import (
+    ResponseTuple,
+    admission,
+    admitted_response,
+    cache_stats_response,
+    client_answers_response,
+    client_id,
+    client_index_response,
+    faq_response,
+    faqs_response,
+    index_response,
+    metrics_response,
+    nav_response,
+    observe_request,
+    profiled_search_response,
+    ready_response,
+    search_batch_response,
+    start_watchers,
+    suggest_response,
+    warm_up,
+)
+
+_FAQ_PATH = re.compile(r"/api/faq/(\d+)")
+_CLIENT_INDEX_PATH = re.compile(r"/api/search-index/([^/]+)")
+_CLIENT_ANSWERS_PATH = re.compile(r"/api/answers/([^/]+)")
+_NAV_PATH = re.compile(r"/api/nav/(\d+)")
+_GET = ("GET", "HEAD")
+_GET_PATHS = frozenset(("/", "/readyz", "/metrics", "/api/faqs", "/api/search", "/api/suggest", "/api/cache/stats"))
+_UNMATCHED = "<unmatched>"
+# How often the event loop's lag is measured, in seconds.
+_LAG_INTERVAL = 0.01
+
+# How late the event loop last ran a timer: about how long a request
+# arriving now waits before its handler starts.
+_loop_lag = 0.0
+_lag_watcher: Optional[asyncio.Task] = None
+
+
+def _headers(scope) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return headers
+
+
+def _query_args(scope) -> Dict[str, str]:
+    args: Dict[str, str] = {}
+    for name, value in parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+        args.setdefault(name, value)
+    return args
+
+
+def _client(scope, headers: Dict[str, str]) -> str:
+    return client_id(scope["client"][0] if scope.get("client") else "", headers)
+
+
+def _json_or_none(content_type: str, body: bytes):
+    """Parse a JSON body the way Flask's ``get_json(silent=True)`` does."""
+    mimetype = content_type.split(";")[0].strip().lower()
+    if mimetype != "application/json" and not (mimetype.startswith("application/") and mimetype.endswith("+json")):
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _error_response(error) -> ResponseTuple:
+    headers = [("Content-Type", "text/html; charset=utf-8")]
+    if isinstance(error, MethodNotAllowed):
+        headers.append(("Allow", ", ".join(error.valid_methods)))
+    return error.get_body().encode("utf-8"), error.code, headers
+
+
+async def _send(send, response: ResponseTuple, include_body: bool = True):
+    body, status, headers = response
+    raw_headers: List[Tuple[bytes, bytes]] = [
+        (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+    ]
+    if status != 304:
+        raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body if include_body else b""})
+
+
+async def _watch_loop_lag():
+    global _loop_lag
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + _LAG_INTERVAL
+        await asyncio.sleep(_LAG_INTERVAL)
+        _loop_lag = max(loop.time() - due, 0.0)
+
+
+async def _lifespan(receive, send):
+    global _lag_watcher
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            warm_up()
+            start_watchers()
+            # Handlers run one at a time on the loop, so requests queue in
+            # front of it rather than for admission control's slots.
+            if admission.max_concurrent > 0:
+                _lag_watcher = asyncio.get_running_loop().create_task(_watch_loop_lag())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _lag_watcher is not None:
+                _lag_watcher.cancel()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point serving the same routes as the Flask app."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    method = scope["method"]
+    path = scope["path"]
+    faq_match = _FAQ_PATH.fullmatch(path)
+    client_index_match = _CLIENT_INDEX_PATH.fullmatch(path)
+    client_answers_match = _CLIENT_ANSWERS_PATH.fullmatch(path)
+    nav_match = _NAV_PATH.fullmatch(path)
+    # Labelled like Flask's URL rules so both modes report the same routes.
+    if faq_match:
+        route = "/api/faq/<int:faq_id>"
+    elif client_index_match:
+        route = "/api/search-index/<version>"
+    elif client_answers_match:
+        route = "/api/answers/<version>"
+    elif nav_match:
+        route = "/api/nav/<int:scheme_code>"
+    else:
+        route = path
+
+    if path == "/api/search/batch":
+        if method != "POST":
+            route = _UNMATCHED
+            response = _error_response(MethodNotAllowed(["OPTIONS", "POST"]))
+        else:
+            payload = _json_or_none(_headers(scope).get("content-type", ""), await _read_body(receive))
+            # Large batches take milliseconds; keep the event loop free meanwhile.
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, search_batch_response, payload)
+    elif path in _GET_PATHS or faq_match or client_index_match or client_answers_match or nav_match:
+        if method not in _GET:
+            route = _UNMATCHED
+            response = _error_response(MethodNotAllowed(["GET", "HEAD", "OPTIONS"]))
+        elif path == "/api/search":
+            headers = _headers(scope)
+            response = admitted_response(_client(scope, headers), route, profiled_search_response,
+                                         _query_args(scope), headers.get("x-profile", ""), queued=_loop_lag)
+        elif path == "/api/suggest":
+            response = suggest_response(_query_args(scope))
+        elif nav_match:
+            response = nav_response(int(nav_match.group(1)), _query_args(scope))
+        elif path == "/readyz":
+            response = ready_response()
+        elif path == "/api/cache/stats":
+            response = cache_stats_response()
+        elif path == "/metrics":
+            response = metrics_response()
+        else:
+            headers = _headers(scope)
+            accept_encoding = headers.get("accept-encoding", "")
+            if_none_match = headers.get("if-none-match", "")
+            if faq_match:
+                response = admitted_response(_client(scope, headers), route, faq_response,
+                                             int(faq_match.group(1)), accept_encoding, if_none_match,
+                                             queued=_loop_lag)
+            elif client_index_match:
+                response = client_index_response(client_index_match.group(1), accept_encoding, if_none_match)
+            elif client_answers_match:
+                response = client_answers_response(client_answers_match.group(1), accept_encoding, if_none_match)
+            elif path == "/":
+                response = index_response(accept_encoding, if_none_match)
+            else:
+                response = faqs_response(accept_encoding, if_none_match)
+    else:
+        route = _UNMATCHED
+        response = _error_response(NotFound())
+
+    await _send(send, response, include_body=method != "HEAD")
+    observe_request(route, response[1], time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi_app:app", port=5001)
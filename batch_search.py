@@ -0,0 +1,154 @@
+"""
+Mutual Fund FAQ Assistant - Batch Search
+Scores a whole batch of queries at once against the shared FAQ index.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from faq_index import MAX_EDIT_DISTANCE, FAQIndex, FAQRecord
+from tokenizer import normalize_all
+
+
+# Separates the queries of a batch in its token stream; normalized text has no NULs.
+_BOUNDARY = "\x00"
+
+
+class BatchScorer:
+    """Vectorized keyword lookup and scoring for many queries.
+
+    The keywords are laid out as a trie of token ids whose edges are a
+    sorted array of ``parent * vocabulary size + token`` keys. The batch's
+    queries are tokenized as one stream and the trie is walked from every
+    token at once, one token deeper per step, so finding every keyword in
+    the batch takes as many vector steps as the longest keyword has
+    tokens. The (query, keyword) hits are expanded through the keyword x
+    FAQ weight matrix (keyword lengths, stored as CSR) into every FAQ
+    score in the batch; the best FAQ per query is then picked with the
+    same first-highest-score rule as :meth:`FAQIndex.search`.
+    """
+
+    def __init__(self, index: FAQIndex):
+        self._index = index
+        postings = index.matcher.postings
+        counts = np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings))
+        self._indptr = np.concatenate(([0], np.cumsum(counts)))
+        # Postings hold slots; store corpus positions so they index ``records``.
+        positions = np.asarray(index.matcher.positions, dtype=np.int64)
+        self._faq = positions[np.fromiter(
+            (slot for p in postings for slot, _ in p), dtype=np.int64, count=int(counts.sum())
+        )]
+        self._weight = np.fromiter(
+            (weight for p in postings for _, weight in p), dtype=np.int64, count=int(counts.sum())
+        )
+
+        # Every keyword token id is below this; later ones cannot match.
+        self._vocabulary_size = len(index.vocabulary)
+        edges: Dict[Tuple[int, int], int] = {}
+        keyword_at = [-1]
+        for phrase, keyword_id in index.matcher.phrases.items():
+            node = 0
+            for token_id in phrase:
+                child = edges.get((node, token_id))
+                if child is None:
+                    child = edges[node, token_id] = len(keyword_at)
+                    keyword_at.append(-1)
+                node = child
+            keyword_at[node] = keyword_id
+        keys = np.fromiter((parent * self._vocabulary_size + token_id for parent, token_id in edges),
+                           dtype=np.int64, count=len(edges))
+        order = np.argsort(keys)
+        self._edge_keys = keys[order]
+        self._edge_nodes = np.fromiter(edges.values(), dtype=np.int64, count=len(edges))[order]
+        self._keyword_at = np.array(keyword_at, dtype=np.int64)
+
+    def _keyword_hits(self, queries: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct ``(query, keyword id)`` pairs of every keyword occurring in a query."""
+        tokens = f" {_BOUNDARY} ".join(queries).split()
+        # One -1 past the end, so a walk always stops before running off the stream.
+        token_ids = np.array(self._index.vocabulary.encode(tokens) + [-1], dtype=np.int64)
+        token_ids[token_ids >= self._vocabulary_size] = -1
+        query_of = np.cumsum(np.fromiter(map(_BOUNDARY.__eq__, tokens), dtype=bool, count=len(tokens)))
+
+        edge_keys, edge_nodes, keyword_at = self._edge_keys, self._edge_nodes, self._keyword_at
+        rows: List[np.ndarray] = []
+        cols: List[np.ndarray] = []
+        starts = np.flatnonzero(token_ids >= 0) if len(edge_keys) else np.zeros(0, dtype=np.int64)
+        nodes = np.zeros(len(starts), dtype=np.int64)
+        depth = 0
+        while len(starts):
+            next_ids = token_ids[starts + depth]
+            keys = nodes * self._vocabulary_size + next_ids
+            found = np.searchsorted(edge_keys, keys)
+            found[found == len(edge_keys)] = 0
+            # Unknown tokens and query boundaries are -1 and end the walk.
+            walking = (next_ids >= 0) & (edge_keys[found] == keys)
+            starts, nodes = starts[walking], edge_nodes[found[walking]]
+            keyword_ids = keyword_at[nodes]
+            ended = keyword_ids >= 0
+            rows.append(query_of[starts[ended]])
+            cols.append(keyword_ids[ended])
+            depth += 1
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # A keyword counts once per query, however often it occurs.
+        n_keywords = len(self._indptr) - 1
+        return np.divmod(np.unique(np.concatenate(rows) * n_keywords + np.concatenate(cols)), n_keywords)
+
+    def best_matches(self, queries: Sequence[str]):
+        """Return ``(faq_indices, scores)`` arrays for normalized ``queries``; the index is -1 where nothing matched."""
+        n_faqs = len(self._index)
+        best_faq = np.full(len(queries), -1, dtype=np.int64)
+        best_score = np.zeros(len(queries), dtype=np.int64)
+
+        rows, cols = self._keyword_hits(queries)
+        if not len(cols):
+            return best_faq, best_score
+
+        # Expand every (query, keyword) hit into that keyword's (faq, weight) postings.
+        starts = self._indptr[cols]
+        counts = self._indptr[cols + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        query_ids = np.repeat(rows, counts)
+        faq_ids = self._faq[offsets]
+
+        # Sum weights per (query, faq) cell, then keep the best cell per query.
+        cells, inverse = np.unique(query_ids * n_faqs + faq_ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=self._weight[offsets]).astype(np.int64)
+        query_ids, faq_ids = np.divmod(cells, n_faqs)
+        order = np.lexsort((faq_ids, -scores, query_ids))
+        query_ids, faq_ids, scores = query_ids[order], faq_ids[order], scores[order]
+        first = np.ones(len(query_ids), dtype=bool)
+        first[1:] = query_ids[1:] != query_ids[:-1]
+
+        best_faq[query_ids[first]] = faq_ids[first]
+        best_score[query_ids[first]] = scores[first]
+        return best_faq, best_score
+
+
+@lru_cache(maxsize=2)
+def get_batch_scorer(index: FAQIndex) -> BatchScorer:
+    """Return the (cached) batch scorer for an index."""
+    return BatchScorer(index)
+
+
+def search_batch(index: FAQIndex, queries: Sequence[str],
+                 max_edit_distance: int = MAX_EDIT_DISTANCE) -> List[Optional[FAQRecord]]:
+    """Find the best matching FAQ for each query, in input order.
+
+    Queries without an exact keyword hit go through the same typo-tolerant
+    fallback as :meth:`FAQIndex.search`.
+    """
+    queries = normalize_all(queries)
+    best_faq, _ = get_batch_scorer(index).best_matches(queries)
+    records = index.records
+    results = [records[faq_idx] if faq_idx >= 0 else None for faq_idx in best_faq.tolist()]
+    if max_edit_distance > 0:
+        fuzzy = index.fuzzy_matcher(max_edit_distance)
+        for i in np.flatnonzero(best_faq < 0).tolist():
+            faq_idx, _ = fuzzy.best_match(queries[i])
+            if faq_idx is not None:
+                results[i] = records[faq_idx]
+    return results
@@ -0,0 +1 @@
+"""Benchmarks for the Mutual Fund FAQ Assistant (run with ``python -m benchmarks.<name>``)."""
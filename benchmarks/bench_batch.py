@@ -0,0 +1,69 @@
+"""
+Batch search versus a loop of single-query matches.
+
+    python -m benchmarks.bench_batch [--sizes 10 1000 10000 100000] [--batch-sizes 16 256 4096]
+
+For each synthetic corpus, batches of chip queries, long sentences, misses
+and typos are answered by ``search_batch`` and by calling ``index.match``
+once per query, as a client without the batch endpoint would. Both must
+return the same FAQs; the table shows the time per query and the speedup.
+"""
+
+import argparse
+import time
+from typing import Callable, List, Sequence
+
+from batch_search import get_batch_scorer, search_batch
+from faq_index import MAX_EDIT_DISTANCE, FAQIndex
+
+from benchmarks.bench_matching import make_queries
+from benchmarks.synthetic import make_corpus
+
+SIZES = (10, 1000, 10000, 100000)
+BATCH_SIZES = (16, 256, 4096)
+ROUNDS = 5
+
+
+def _per_query_us(fn: Callable[[Sequence[str]], object], queries: List[str]) -> float:
+    """Best of a few rounds, in microseconds per query."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(queries)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    args = parser.parse_args()
+
+    print(f"{'size':>7} {'mix':<9} {'batch':>6} {'loop us':>9} {'batch us':>9} {'speedup':>8}")
+    for size in args.sizes:
+        index = FAQIndex(make_corpus(size))
+        index.fuzzy_matcher(MAX_EDIT_DISTANCE)
+        get_batch_scorer(index)
+        mixes = make_queries(index, max(args.batch_sizes), seed=size)
+
+        def loop(queries: Sequence[str]):
+            return [index.match(query, MAX_EDIT_DISTANCE)[0] for query in queries]
+
+        def batch(queries: Sequence[str]):
+            return search_batch(index, queries, MAX_EDIT_DISTANCE)
+
+        for mix, all_queries in mixes.items():
+            for batch_size in args.batch_sizes:
+                queries = all_queries[:batch_size]
+                if batch(queries) != loop(queries):
+                    raise AssertionError(f"search_batch disagrees with index.match ({size} FAQs, {mix})")
+                loop_us = _per_query_us(loop, queries)
+                batch_us = _per_query_us(batch, queries)
+                print(f"{size:>7} {mix:<9} {batch_size:>6} {loop_us:>9.1f} {batch_us:>9.1f} "
+                      f"{loop_us / batch_us:>7.1f}x")
+        get_batch_scorer.cache_clear()
+
+
+if __name__ == "__main__":
+    main()
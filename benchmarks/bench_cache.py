@@ -0,0 +1,91 @@
+"""
+Hit latency of the per-process and shared (SQLite) result caches versus recomputing the match.
+
+    python -m benchmarks.bench_cache [--size 10000] [--queries 2000] [--processes 4]
+
+Every query is answered once to fill the caches, then looked up again. The
+shared cache is also read by --processes forked processes at once, as
+gunicorn workers would, to show how hits hold up under concurrent readers.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, List, Sequence
+
+from app import _search_entry
+from faq_index import FAQIndex
+from result_cache import ResultCache, SharedResultCache
+from tokenizer import normalize
+
+from benchmarks.synthetic import make_corpus
+
+
+def _latencies_us(fn: Callable[[str], object], queries: Sequence[str]) -> List[float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return sorted(samples)
+
+
+def _report(name: str, samples: List[float]):
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<28} {statistics.median(samples):>9.1f} {p99:>9.1f} {len(samples):>8}")
+
+
+def _shared_reader(args) -> List[float]:
+    path, version, queries = args
+    cache = SharedResultCache(path)
+    return _latencies_us(lambda query: cache.get(version, query), queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000, help="FAQs in the synthetic corpus")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4, help="concurrent readers of the shared cache")
+    args = parser.parse_args()
+
+    index = FAQIndex(make_corpus(args.size))
+    rng = random.Random(args.size)
+    keywords = [keyword for keywords in index.keywords for keyword in keywords]
+    templates = ("what is {}", "{}", "tell me about {} for my fund", "how does {} work")
+    queries = list(dict.fromkeys(
+        normalize(rng.choice(templates).format(rng.choice(keywords))) for _ in range(args.queries)
+    ))
+    entries = {query: _search_entry(index, query, None, use_cache=False) for query in queries}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search_cache.db")
+        local = ResultCache(len(queries))
+        shared = SharedResultCache(path, len(queries))
+        store_us = _latencies_us(lambda query: shared.put(index.version, query, entries[query]), queries)
+        for query in queries:
+            local.put(index.version, query, entries[query])
+
+        print(f"{'':<28} {'p50 us':>9} {'p99 us':>9} {'lookups':>8}")
+        _report("recompute match", _latencies_us(lambda query: _search_entry(index, query, None, use_cache=False),
+                                                 queries))
+        _report("per-process cache hit", _latencies_us(lambda query: local.get(index.version, query), queries))
+        _report("shared cache hit", _latencies_us(lambda query: shared.get(index.version, query), queries))
+        _report("shared cache miss", _latencies_us(lambda query: shared.get("other", query), queries))
+        _report("shared cache store", store_us)
+
+        start = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(args.processes) as pool:
+            per_process = pool.map(_shared_reader, [(path, index.version, queries)] * args.processes)
+        seconds = time.perf_counter() - start
+        samples = sorted(sample for samples in per_process for sample in samples)
+        _report(f"shared hit, {args.processes} processes", samples)
+        print(f"\n{len(samples) / seconds:,.0f} shared hits/s across {args.processes} processes "
+              f"(including process start-up)")
+
+
+if __name__ == "__main__":
+    main()
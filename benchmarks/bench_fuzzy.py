@@ -0,0 +1,61 @@
+"""
+Fuzzy vs exact keyword matching latency across corpus sizes.
+
+    python -m benchmarks.bench_fuzzy [--max-edit-distance 2]
+
+Exact queries contain a keyword verbatim; typo queries contain a keyword of
+five or more characters with one edit, so they miss the exact path and are
+answered by the symmetric-delete fallback.
+"""
+
+import argparse
+import random
+import time
+
+from faq_index import FAQIndex
+from fuzzy import DEFAULT_MAX_EDIT_DISTANCE
+
+from benchmarks.synthetic import add_typo, make_corpus
+
+SIZES = (10, 1000, 10000)
+QUERIES = 2000
+
+
+def _per_query_us(fn, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-edit-distance", type=int, default=DEFAULT_MAX_EDIT_DISTANCE)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'exact us':>10} {'fuzzy us':>10} {'ratio':>7} {'build s':>8} {'typo hit %':>11}")
+    for size in SIZES:
+        index = FAQIndex(make_corpus(size))
+        rng = random.Random(size)
+        keywords = [keyword for keywords in index.keywords for keyword in keywords if len(keyword) >= 5]
+        templates = ("what is {}", "{}", "tell me about {} for my fund", "how does {} work")
+        exact = [rng.choice(templates).format(rng.choice(keywords)) for _ in range(QUERIES)]
+        typos = []
+        while len(typos) < QUERIES:
+            query = rng.choice(templates).format(add_typo(rng.choice(keywords), rng))
+            if index.match(query, max_edit_distance=0)[0] is None:
+                typos.append(query)
+
+        start = time.perf_counter()
+        index.fuzzy_matcher(args.max_edit_distance)
+        build = time.perf_counter() - start
+
+        exact_us = _per_query_us(lambda q: index.match(q, max_edit_distance=0), exact)
+        fuzzy_us = _per_query_us(lambda q: index.match(q, max_edit_distance=args.max_edit_distance), typos)
+        hits = sum(index.match(q, args.max_edit_distance)[0] is not None for q in typos)
+        print(f"{size:>8} {exact_us:>10.1f} {fuzzy_us:>10.1f} {fuzzy_us / exact_us:>6.1f}x "
+              f"{build:>8.2f} {hits / len(typos) * 100:>10.1f}%")
+
+
+if __name__ == "__main__":
+    main()
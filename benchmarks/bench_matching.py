@@ -0,0 +1,197 @@
+"""
+Latency, throughput and memory of every matching engine across corpus sizes.
+
+    python -m benchmarks.bench_matching [--sizes 10 1000 10000 100000] [--output bench_matching.json]
+    python -m benchmarks.bench_matching --baseline old.json [--threshold 0.2]
+
+Each synthetic corpus is queried with four mixes: the topic chips, long
+natural sentences around a keyword, misses that match nothing, and
+keywords with one typo. Engines:
+
+    exact     keyword match without the typo-tolerant fallback
+    fuzzy     the full single-query search path (exact, then fuzzy)
+    bm25      top-5 BM25 ranking
+    semantic  top-5 embedding similarity
+    batch     search_batch in chunks of 256 queries (latency per query, amortized)
+
+Results are written as JSON. With ``--baseline`` the run exits with status 1
+when any p50 or p99 latency is more than ``--threshold`` above the baseline.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from app import WARM_UP_QUERIES
+from batch_search import get_batch_scorer, search_batch
+from faq_index import MAX_EDIT_DISTANCE, FAQIndex
+from ranking import get_ranker
+from semantic import get_semantic_index
+
+from benchmarks.synthetic import add_typo, make_corpus
+
+SIZES = (10, 1000, 10000, 100000)
+QUERIES = 1000
+BATCH_SIZE = 256
+
+_SENTENCES = (
+    "hi, i have been investing for a few years and wanted to know about {} for my portfolio",
+    "could you please explain {} in simple terms, my advisor mentioned it last week",
+    "before i put more money in, how does {} affect what i actually get back over time",
+)
+_MISS_WORDS = ("weather", "football", "pizza", "guitar", "holiday", "train", "museum", "coffee",
+               "painting", "mountain", "keyboard", "garden", "sunrise", "violin", "bicycle")
+
+
+def make_queries(index: FAQIndex, count: int, seed: int) -> Dict[str, List[str]]:
+    """Return the query mixes for an index, ``count`` queries each."""
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in index.keywords for keyword in keywords if len(keyword) >= 5]
+    misses = []
+    while len(misses) < count:
+        query = " ".join(rng.sample(_MISS_WORDS, rng.randint(2, 5)))
+        if index.match(query)[0] is None:
+            misses.append(query)
+    typos = []
+    while len(typos) < count:
+        query = add_typo(rng.choice(keywords), rng)
+        if index.match(query, max_edit_distance=0)[0] is None:
+            typos.append(query)
+    return {
+        "chips": [WARM_UP_QUERIES[i % len(WARM_UP_QUERIES)] for i in range(count)],
+        "sentences": [rng.choice(_SENTENCES).format(rng.choice(keywords)) for _ in range(count)],
+        "misses": misses,
+        "typos": typos,
+    }
+
+
+def _engines(index: FAQIndex) -> Dict[str, Callable[[Sequence[str]], object]]:
+    """Each engine takes a chunk of queries; all but ``batch`` get one query at a time."""
+    ranker = get_ranker(index)
+    semantic = get_semantic_index(index)
+    return {
+        "exact": lambda queries: index.match(queries[0], max_edit_distance=0),
+        "fuzzy": lambda queries: index.match(queries[0], MAX_EDIT_DISTANCE),
+        "bm25": lambda queries: ranker.rank(queries[0], 5),
+        "semantic": lambda queries: semantic.rank(queries[0], 5),
+        "batch": lambda queries: search_batch(index, queries),
+    }
+
+
+def _build(index: FAQIndex) -> Dict[str, float]:
+    """Build every lazy engine, returning the seconds and peak traced MiB it took."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    index.fuzzy_matcher(MAX_EDIT_DISTANCE)
+    get_batch_scorer(index)
+    get_ranker(index)
+    get_semantic_index(index)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"build_s": seconds, "build_peak_mib": peak / 2 ** 20}
+
+
+def _measure(engine: Callable, queries: List[str], chunk: int) -> Dict[str, float]:
+    chunks = [queries[i:i + chunk] for i in range(0, len(queries), chunk)]
+    engine(chunks[0])  # warm-up
+    latencies = np.empty(len(chunks))
+    start = time.perf_counter()
+    for i, queries_chunk in enumerate(chunks):
+        begin = time.perf_counter()
+        engine(queries_chunk)
+        latencies[i] = (time.perf_counter() - begin) / len(queries_chunk)
+    elapsed = time.perf_counter() - start
+
+    # Separate pass: tracemalloc slows every allocation down.
+    tracemalloc.start()
+    for queries_chunk in chunks:
+        engine(queries_chunk)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1e6
+    return {"p50_us": p50, "p95_us": p95, "p99_us": p99,
+            "qps": len(queries) / elapsed, "peak_kib": peak / 2 ** 10}
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """Describe every p50/p99 latency more than ``threshold`` above its baseline."""
+    previous = {(r["size"], r["engine"], r["mix"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["size"], result["engine"], result["mix"]))
+        if before is None:
+            continue
+        for metric in ("p50_us", "p99_us"):
+            if result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"size={result['size']} engine={result['engine']} mix={result['mix']} {metric}: "
+                    f"{before[metric]:.1f} -> {result[metric]:.1f} "
+                    f"(+{(result[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--queries", type=int, default=QUERIES, help="queries per mix")
+    parser.add_argument("--output", default="bench_matching.json")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    results = []
+    builds = []
+    print(f"{'size':>7} {'engine':<8} {'mix':<9} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} "
+          f"{'queries/s':>10} {'peak KiB':>9}")
+    for size in args.sizes:
+        index = FAQIndex(make_corpus(size))
+        build = _build(index)
+        builds.append({"size": size, **build})
+        print(f"{size:>7} built in {build['build_s']:.2f}s, peak {build['build_peak_mib']:.1f} MiB")
+        mixes = make_queries(index, args.queries, seed=size)
+        for engine_name, engine in _engines(index).items():
+            chunk = BATCH_SIZE if engine_name == "batch" else 1
+            for mix, queries in mixes.items():
+                result = {"size": size, "engine": engine_name, "mix": mix,
+                          **_measure(engine, queries, chunk)}
+                results.append(result)
+                print(f"{size:>7} {engine_name:<8} {mix:<9} {result['p50_us']:>9.1f} "
+                      f"{result['p95_us']:>9.1f} {result['p99_us']:>9.1f} {result['qps']:>10.0f} "
+                      f"{result['peak_kib']:>9.1f}")
+        get_batch_scorer.cache_clear()
+        get_ranker.cache_clear()
+        get_semantic_index.cache_clear()
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "queries_per_mix": args.queries,
+            "builds": builds,
+            "results": results,
+        }, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Scheme name resolution latency against AMFI-sized scheme masters.
+
+    python -m benchmarks.bench_schemes [--sizes 10000 40000 160000] [--queries 2000]
+
+Every uncached /api/search resolves its query, so all three mixes count:
+queries naming a scheme (abbreviated, as users type them), queries naming
+only a fund house, and generic questions that name none.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List, Sequence
+
+from schemes import SchemeResolver
+
+from benchmarks.synthetic import make_schemes
+
+SIZES = (10000, 40000, 160000)
+_ABBREVIATIONS = {"Direct Plan": "dir", "Regular Plan": "reg", "Growth": "gr", "IDCW": "div"}
+_GENERIC = ("what is a flexi cap fund", "how is exit load charged", "direct plan vs regular plan",
+            "what is the expense ratio of an index fund", "how do i switch from idcw to growth")
+
+
+def _latencies_us(fn: Callable[[str], object], queries: Sequence[str]) -> List[float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return sorted(samples)
+
+
+def _typed(name: str, rng: random.Random) -> str:
+    words = []
+    for part in name.split(" - "):
+        words.append(_ABBREVIATIONS.get(part, part) if rng.random() < 0.5 else part)
+    return "exit load of " + " ".join(words).lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="schemes in the synthetic master")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'build s':>8} {'mix':<12} {'p50 us':>9} {'p99 us':>9} {'resolved %':>11}")
+    for size in args.sizes:
+        schemes = make_schemes(size)
+        start = time.perf_counter()
+        resolver = SchemeResolver(schemes)
+        build = time.perf_counter() - start
+
+        rng = random.Random(size)
+        mixes = {
+            "scheme": [_typed(rng.choice(schemes)["name"], rng) for _ in range(args.queries)],
+            "fund house": [f"{rng.choice(schemes)['amc'].lower()} customer care number"
+                           for _ in range(args.queries)],
+            "generic": [rng.choice(_GENERIC) for _ in range(args.queries)],
+        }
+        for mix, queries in mixes.items():
+            samples = _latencies_us(resolver.resolve, queries)
+            resolved = sum(bool(resolver.resolve(query)) for query in queries) / len(queries) * 100
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            print(f"{size:>8} {build:>8.2f} {mix:<12} {statistics.median(samples):>9.1f} {p99:>9.1f} "
+                  f"{resolved:>10.1f}%")
+
+
+if __name__ == "__main__":
+    main()
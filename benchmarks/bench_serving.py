@@ -0,0 +1,148 @@
+"""
+Requests/sec and latency of the Flask (threaded WSGI), ASGI and gunicorn serving modes.
+
+    python -m benchmarks.bench_serving [--duration 5] [--concurrency 1 64 1024] [--modes flask asgi gunicorn]
+
+Each mode runs in its own server process on localhost. Every client keeps
+one HTTP/1.1 connection open (reconnecting whenever the server closes it)
+and sends /api/search requests back to back for the given duration.
+"""
+
+import argparse
+import asyncio
+import resource
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+from urllib.parse import quote
+
+QUERIES = ("expense ratio", "exit load", "minimum sip", "elss lock-in", "riskometer",
+           "benchmark", "download statement", "nav", "kyc", "aum", "what is the tax on redemption")
+
+SERVERS = {
+    "flask": [sys.executable, "-c",
+              "import sys; from werkzeug.serving import run_simple; from app import app; "
+              "run_simple('127.0.0.1', int(sys.argv[1]), app, threaded=True)", "{port}"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi_app:app", "--host", "127.0.0.1",
+             "--log-level", "warning", "--no-access-log", "--backlog", "4096", "--port", "{port}"],
+    # One worker per core (MF_FAQ_WORKERS overrides); compare with "flask" for multi-core scaling.
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                 "--bind", "127.0.0.1:{port}", "--log-level", "warning"],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def _request(reader, writer, path: str) -> bool:
+    """Send one GET and read the response; return whether the connection stays open."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    keep_alive = status_line.startswith(b"HTTP/1.1")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    if not status_line.split()[1].startswith(b"2"):
+        raise ConnectionError(status_line.decode("latin-1").strip())
+    return keep_alive
+
+
+async def _client(port: int, deadline: float, offset: int, latencies: List[float], errors: List[int]):
+    connection = None
+    i = offset
+    while time.perf_counter() < deadline:
+        path = "/api/search?q=" + quote(QUERIES[i % len(QUERIES)])
+        i += 1
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection("127.0.0.1", port)
+            if not await _request(*connection, path):
+                connection[1].close()
+                connection = None
+            latencies.append(time.perf_counter() - start)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            errors[0] += 1
+            if connection is not None:
+                connection[1].close()
+                connection = None
+            await asyncio.sleep(0.01)
+    if connection is not None:
+        connection[1].close()
+
+
+async def _load(port: int, concurrency: int, duration: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = [0]
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        _client(port, deadline, offset, latencies, errors) for offset in range(concurrency)
+    ))
+    return latencies, errors[0]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--modes", nargs="+", choices=sorted(SERVERS), default=["flask", "asgi"])
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"{'mode':<8} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode in args.modes:
+        port = _free_port()
+        server = subprocess.Popen([arg.format(port=port) for arg in SERVERS[mode]],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_for_port(port)
+            asyncio.run(_load(port, 1, 0.5))  # warm-up
+            for concurrency in args.concurrency:
+                latencies, errors = asyncio.run(_load(port, concurrency, args.duration))
+                latencies.sort()
+                print(f"{mode:<8} {concurrency:>7} {len(latencies) / args.duration:>9.0f} "
+                      f"{_percentile(latencies, 50) * 1e3:>8.2f} {_percentile(latencies, 99) * 1e3:>8.2f} "
+                      f"{errors:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Rerun latency and per-session memory of the Streamlit app.
+
+    python -m benchmarks.bench_streamlit [--script streamlit_app.py] [--runs 50] [--sessions 20]
+
+Drives the script headlessly with streamlit's AppTest: a first run, typing a
+query, and clicking each topic chip. To compare against another version of
+the app, save it next to this checkout and pass it with --script, e.g.
+
+    git show HEAD~1:streamlit_app.py > old_streamlit_app.py
+    python -m benchmarks.bench_streamlit --script old_streamlit_app.py
+
+Every interaction reruns the whole script, as it does in the browser, so
+the timings cover the page's elements as well as search and card rendering.
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List
+
+from streamlit.testing.v1 import AppTest
+
+from faq_index import POPULAR_TOPICS
+
+TYPED_QUERIES = ("expense ratio", "what is the exit load", "minimum sip amount",
+                 "elss lokc in", "how do I download my statement", "weather today")
+
+
+def _timed(action: Callable[[], object], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name: str, samples: List[float]):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<14} {statistics.median(samples) * 1000:>9.2f} {p95 * 1000:>9.2f} {len(samples):>6}")
+
+
+def _session(script: str) -> AppTest:
+    # AppTest resolves relative paths against this file, not the working directory.
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=30)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{script} failed: {at.exception[0].message}")
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit rerun latency and session memory.")
+    parser.add_argument("--script", default="streamlit_app.py")
+    parser.add_argument("--runs", type=int, default=50, help="reruns per interaction")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions kept alive for the memory figure")
+    args = parser.parse_args()
+
+    _session(args.script)  # import the modules and fill the shared caches
+
+    first_runs = _timed(lambda: _session(args.script), max(1, args.runs // 5))
+
+    at = _session(args.script)
+    queries = iter(TYPED_QUERIES * (args.runs // len(TYPED_QUERIES) + 1))
+    typing = _timed(lambda: at.text_input[0].input(next(queries)).run(), args.runs)
+
+    at.text_input[0].input("").run()
+    chips = iter(range(args.runs))
+    clicks = _timed(
+        lambda: at.button(key=f"topic_{next(chips) % len(POPULAR_TOPICS)}").click().run(), args.runs
+    )
+
+    print(f"{'interaction':<14} {'p50 ms':>9} {'p95 ms':>9} {'runs':>6}")
+    _report("first run", first_runs)
+    _report("type query", typing)
+    _report("chip click", clicks)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    for i in range(args.sessions):
+        session = _session(args.script)
+        session.text_input[0].input(TYPED_QUERIES[i % len(TYPED_QUERIES)]).run()
+        session.button(key=f"topic_{i % len(POPULAR_TOPICS)}").click().run()
+        sessions.append(session)
+    gc.collect()
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+    tracemalloc.stop()
+    print(f"\nper-session memory: {per_session / 1024:.1f} KiB ({len(sessions)} sessions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Replay a JSONL request log against the web app and report latency per route.
+
+    python -m benchmarks.replay requests.log [--target flask|http://127.0.0.1:5001]
+                                [--concurrency 8 | --rate 500] [--limit N]
+    python -m benchmarks.replay requests.jsonl --query-field title
+
+Each log line is a JSON object describing one request, read lazily so logs
+of any size can be replayed:
+
+    {"path": "/api/faqs", "headers": {"Accept-Encoding": "gzip"}}
+    {"method": "POST", "path": "/api/search/batch", "body": {"queries": ["nav"]}}
+    {"q": "expense ratio"}      -> GET /api/search?q=expense%20ratio
+    {"id": 3}                   -> GET /api/faq/3
+
+``--query-field`` replays every line as a search for that field instead.
+The target is either the in-process Flask test client or a base URL. With ``--rate`` the
+requests are sent on a fixed schedule and latency is measured from the
+scheduled time, so a slow server cannot hide its queueing delay;
+otherwise ``--concurrency`` workers send requests back to back.
+"""
+
+import argparse
+import http.client
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+_FAQ_PATH = re.compile(r"/api/faq/\d+")
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: Optional[bytes]
+
+
+def read_log(path: str, query_field: Optional[str] = None,
+             malformed: Optional[List[int]] = None) -> Iterator[Request]:
+    """Yield the requests of a JSONL log one line at a time, skipping lines without a request.
+
+    Lines that are not a JSON object are skipped too, and their line
+    numbers appended to ``malformed`` when it is given.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                entry = None
+            if not isinstance(entry, dict):
+                if malformed is not None:
+                    malformed.append(line_number)
+                continue
+            if "path" not in entry:
+                # Shorthand entries; other fields (e.g. a free-text "body") are ignored.
+                if "id" in entry and not query_field:
+                    yield Request("GET", f"/api/faq/{int(entry['id'])}", {}, None)
+                else:
+                    query = entry.get(query_field or "q")
+                    if query is not None:
+                        yield Request("GET", "/api/search?q=" + quote(str(query)), {}, None)
+                continue
+            headers = dict(entry.get("headers", {}))
+            body = entry.get("body")
+            if body is not None and not isinstance(body, str):
+                body = json.dumps(body)
+                headers.setdefault("Content-Type", "application/json")
+            yield Request(entry.get("method", "POST" if body is not None else "GET"), entry["path"],
+                          headers, body.encode("utf-8") if body is not None else None)
+
+
+def route_of(path: str) -> str:
+    """Group a request path by route, e.g. ``/api/faq/7?x=1`` -> ``/api/faq/<id>``."""
+    path = path.split("?", 1)[0]
+    return "/api/faq/<id>" if _FAQ_PATH.fullmatch(path) else path
+
+
+class _FlaskTarget:
+    def __init__(self):
+        from app import app, warm_up
+
+        warm_up()
+        self._client = app.test_client()
+
+    def send(self, request: Request) -> int:
+        response = self._client.open(request.path, method=request.method,
+                                     headers=request.headers, data=request.body)
+        response.close()
+        return response.status_code
+
+
+class _HTTPTarget:
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._prefix = parts.path.rstrip("/")
+        self._connection = None
+
+    def send(self, request: Request) -> int:
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(self._host, self._port, timeout=30)
+        try:
+            self._connection.request(request.method, self._prefix + request.path,
+                                     body=request.body, headers=request.headers)
+            response = self._connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self._connection.close()
+            self._connection = None
+            raise
+        if response.will_close:
+            self._connection.close()
+            self._connection = None
+        return response.status
+
+
+class Replayer:
+    """Sends requests from a shared iterator with a pool of worker threads."""
+
+    def __init__(self, target: str, concurrency: int, rate: Optional[float] = None):
+        self._target = target
+        self._concurrency = concurrency
+        self._rate = rate
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+
+    def _make_target(self):
+        return _FlaskTarget() if self._target == "flask" else _HTTPTarget(self._target)
+
+    def _worker(self, requests: Iterator[Tuple[int, Request]], start: float, target):
+        while True:
+            with self._lock:
+                item = next(requests, None)
+            if item is None:
+                return
+            sequence, request = item
+            if self._rate:
+                scheduled = start + sequence / self._rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+            try:
+                failed = target.send(request) >= 400
+            except (OSError, http.client.HTTPException):
+                failed = True
+            latency = time.perf_counter() - scheduled
+            route = route_of(request.path)
+            with self._lock:
+                self._latencies.setdefault(route, []).append(latency)
+                if failed:
+                    self._errors[route] = self._errors.get(route, 0) + 1
+
+    def run(self, requests: Iterator[Request]) -> Dict[str, dict]:
+        """Replay ``requests`` and return the per-route summary."""
+        targets = [self._make_target() for _ in range(self._concurrency)]
+        numbered = enumerate(requests)
+        start = time.perf_counter()
+        workers = [threading.Thread(target=self._worker, args=(numbered, start, target))
+                   for target in targets]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        summary = {}
+        for route, latencies in sorted(self._latencies.items()):
+            p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1e3
+            summary[route] = {
+                "requests": len(latencies),
+                "errors": self._errors.get(route, 0),
+                "error_rate": self._errors.get(route, 0) / len(latencies),
+                "rps": len(latencies) / elapsed,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+            }
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="JSONL request log")
+    parser.add_argument("--target", default="flask", help='"flask" (in-process test client) or a base URL')
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="requests/sec to send on a fixed schedule")
+    parser.add_argument("--limit", type=int, help="stop after this many requests")
+    parser.add_argument("--query-field", help="log field to use as the search query")
+    parser.add_argument("--output", help="also write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    malformed: List[int] = []
+    requests = read_log(args.log, args.query_field, malformed)
+    if args.limit is not None:
+        requests = (request for _, request in zip(range(args.limit), requests))
+    summary = Replayer(args.target, args.concurrency, args.rate).run(requests)
+
+    print(f"{'route':<20} {'requests':>9} {'errors':>7} {'error %':>8} {'req/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in summary.items():
+        print(f"{route:<20} {stats['requests']:>9} {stats['errors']:>7} {stats['error_rate'] * 100:>7.2f}% "
+              f"{stats['rps']:>9.0f} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    if malformed:
+        print(f"skipped {len(malformed)} malformed log lines (first: line {malformed[0]})")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Synthetic corpora shaped like the FAQ database, for benchmarks at scale.
+"""
+
+import random
+import re
+from typing import List
+
+from faq_index import FAQ_INDEX
+
+_WORDS = sorted({
+    word
+    for faq in FAQ_INDEX
+    for word in re.findall(r"[a-z]{3,}", (faq.question + " " + faq.answer).lower())
+})
+
+
+def make_corpus(size: int, seed: int = 0) -> List[dict]:
+    """Return ``size`` FAQ dicts with unique ids and random multi-word keywords.
+
+    The first entries are the real FAQs so realistic queries still hit.
+    """
+    rng = random.Random(seed)
+    faqs = [faq._asdict() for faq in FAQ_INDEX][:size]
+    for faq_id in range(len(faqs) + 1, size + 1):
+        template = FAQ_INDEX.records[faq_id % len(FAQ_INDEX)]
+        keywords = [
+            " ".join(rng.sample(_WORDS, rng.choice((1, 1, 2, 2, 3))))
+            for _ in range(rng.randint(3, 6))
+        ]
+        faqs.append({
+            "id": faq_id,
+            "keywords": keywords,
+            "question": f"{template.question} ({keywords[0]})",
+            "answer": " ".join(rng.choices(_WORDS, k=rng.randint(40, 120))),
+            "source": template.source,
+            "source_name": template.source_name
+        })
+    return faqs
+
+
+def add_typo(text: str, rng: random.Random) -> str:
+    """Apply one random substitution, deletion, insertion or transposition."""
+    if len(text) < 2:
+        return text
+    i = rng.randrange(len(text) - 1)
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    edit = rng.choice(("substitute", "delete", "insert", "transpose"))
+    if edit == "substitute":
+        return text[:i] + letter + text[i + 1:]
+    if edit == "delete":
+        return text[:i] + text[i + 1:]
+    if edit == "insert":
+        return text[:i] + letter + text[i:]
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+_AMCS = (
+    "Aditya Birla Sun Life", "Axis", "Bandhan", "Bank of India", "Baroda BNP Paribas", "Canara Robeco", "DSP",
+    "Edelweiss", "Franklin Templeton", "Groww", "HDFC", "HSBC", "ICICI Prudential", "Invesco", "ITI", "JM Financial",
+    "Kotak Mahindra", "LIC", "Mahindra Manulife", "Mirae Asset", "Motilal Oswal", "Navi", "Nippon India", "NJ",
+    "Old Bridge", "PGIM India", "PPFAS", "Quant", "Quantum", "Samco", "SBI", "Shriram", "Sundaram", "Tata",
+    "Taurus", "Trust", "Union", "UTI", "WhiteOak Capital", "Zerodha",
+)
+_CATEGORIES = (
+    "Flexi Cap", "Large Cap", "Mid Cap", "Small Cap", "Large & Mid Cap", "Multi Cap", "Focused", "Value",
+    "Contra", "ELSS Tax Saver", "Dividend Yield", "Banking and Financial Services", "Infrastructure",
+    "Technology", "Pharma and Healthcare", "Consumption", "Balanced Advantage", "Aggressive Hybrid",
+    "Equity Savings", "Arbitrage", "Multi Asset Allocation", "Liquid", "Overnight", "Ultra Short Duration",
+    "Low Duration", "Money Market", "Short Duration", "Corporate Bond", "Banking and PSU Debt", "Gilt",
+    "Dynamic Bond", "Credit Risk", "Nifty 50 Index", "Nifty Next 50 Index", "Gold ETF Fund of Fund",
+)
+_OPTIONS = ("Growth", "IDCW", "IDCW Reinvestment", "IDCW Payout", "Bonus")
+
+
+def make_schemes(size: int, seed: int = 0) -> List[dict]:
+    """Return ``size`` scheme master rows named like AMFI's, every plan and
+    option its own row; past the real category count, numbered series fill
+    in, as fixed maturity plans do in the real master."""
+    rng = random.Random(seed)
+    schemes = []
+    series = 0
+    while len(schemes) < size:
+        series += 1
+        for amc in _AMCS:
+            category = rng.choice(_CATEGORIES)
+            name = f"{amc} {category} Fund" if series <= len(_CATEGORIES) else \
+                f"{amc} Fixed Term Plan Series {series} {rng.randint(1200, 3700)} Days"
+            for plan in ("Direct Plan", "Regular Plan"):
+                for option in _OPTIONS[:rng.randint(1, len(_OPTIONS))]:
+                    schemes.append({
+                        "code": 100000 + len(schemes),
+                        "name": f"{name} - {plan} - {option}",
+                        "amc": f"{amc} Mutual Fund"
+                    })
+    return schemes[:size]
@@ -0,0 +1,32 @@
+"""
+Mutual Fund FAQ Assistant - Client Search Index
+Compact keyword index the web UI downloads to answer queries in the browser.
+"""
+
+from typing import Dict, List
+
+from faq_index import FAQIndex
+
+
+def build_client_index(index: FAQIndex) -> dict:
+    """Serializable form of the exact keyword matcher of ``index``.
+
+    ``ids`` lists the FAQ ids in corpus order and ``keywords`` maps every
+    normalized keyword to a flat ``[position, weight, ...]`` list of the
+    FAQs it belongs to, ``position`` being an offset into ``ids``. Scoring
+    it like :class:`keyword_index.KeywordIndex` does (phrase matches on
+    token boundaries, each matched keyword adding its weight once per
+    occurrence in an FAQ's keyword list, ties going to the lowest
+    position) gives the same FAQ as :meth:`FAQIndex.match` whenever a
+    keyword matches exactly. Typo-tolerant fallbacks stay on the server.
+    """
+    keywords: Dict[str, List[int]] = {}
+    for position, faq in enumerate(index):
+        for keyword in faq.keywords:
+            if keyword:
+                keywords.setdefault(keyword, []).extend((position, len(keyword)))
+    return {
+        "version": index.version,
+        "ids": [faq.id for faq in index],
+        "keywords": keywords
+    }
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Mutual Fund FAQ Assistant - Corpus
+Loads the FAQ corpus from its JSON/JSONL or compiled binary file and polls data files for edits.
+
+    python corpus.py data/faqs.json data/faqs.bin
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CORPUS_PATH = os.environ.get(
+    "MF_FAQ_CORPUS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "faqs.json")
+)
+
+REQUIRED_FIELDS = ("id", "question", "answer", "source", "source_name", "keywords")
+
+
+# Binary corpus layout (little-endian, every section 8-byte aligned):
+#   header         magic, format version, FAQ count, keyword count, blob size
+#   ids            int64[count]
+#   spans          uint64[count, 4, 2]: (start, length) in blob of question, answer, source, source_name
+#   digests        uint8[count, 32]: SHA-256 of each answer
+#   keyword_ptr    uint64[count + 1]: each FAQ's range of keyword_spans
+#   keyword_spans  uint64[keywords, 2]
+#   blob           UTF-8 text
+BINARY_MAGIC = b"MFFAQBIN"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")
+_TEXT_FIELDS = ("question", "answer", "source", "source_name")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _sections(count: int, n_keywords: int) -> List[Tuple[str, np.dtype, tuple, int]]:
+    """``(name, dtype, shape, offset)`` of each array section."""
+    layout = [
+        ("ids", np.dtype("<i8"), (count,)),
+        ("spans", np.dtype("<u8"), (count, len(_TEXT_FIELDS), 2)),
+        ("digests", np.dtype("u1"), (count, 32)),
+        ("keyword_ptr", np.dtype("<u8"), (count + 1,)),
+        ("keyword_spans", np.dtype("<u8"), (n_keywords, 2)),
+    ]
+    sections = []
+    offset = _aligned(_HEADER.size)
+    for name, dtype, shape in layout:
+        sections.append((name, dtype, shape, offset))
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape)))
+    sections.append(("blob", np.dtype("u1"), (), offset))
+    return sections
+
+
+def _validate(faqs, path: str):
+    if not isinstance(faqs, list):
+        raise ValueError(f"{path}: expected a list of FAQs")
+    for i, faq in enumerate(faqs):
+        missing = [field for field in REQUIRED_FIELDS if not isinstance(faq, dict) or field not in faq]
+        if missing:
+            raise ValueError(f"{path}: FAQ #{i + 1} is missing {', '.join(missing)}")
+
+
+def write_binary_corpus(faqs: Sequence[dict], path: str):
+    """Compile FAQ dicts into the binary format read by :class:`MappedCorpus`.
+
+    The file is written next to ``path`` and renamed into place, so
+    processes that have the previous version mapped keep reading it intact.
+    """
+    faqs = list(faqs)
+    _validate(faqs, path)
+    blob = bytearray()
+
+    def span(text: str) -> Tuple[int, int]:
+        data = text.encode("utf-8")
+        blob.extend(data)
+        return len(blob) - len(data), len(data)
+
+    # Field by field, answers last: building the index reads everything
+    # else, and answer pages are only touched when an answer is served.
+    spans = np.zeros((len(faqs), len(_TEXT_FIELDS), 2), dtype="<u8")
+    for field in ("question", "source", "source_name"):
+        spans[:, _TEXT_FIELDS.index(field)] = [span(faq[field]) for faq in faqs]
+    keyword_spans = [span(keyword) for faq in faqs for keyword in faq["keywords"]]
+    spans[:, _TEXT_FIELDS.index("answer")] = [span(faq["answer"]) for faq in faqs]
+    arrays = {
+        "ids": np.array([faq["id"] for faq in faqs], dtype="<i8"),
+        "spans": spans,
+        "digests": np.array([
+            list(hashlib.sha256(faq["answer"].encode("utf-8")).digest()) for faq in faqs
+        ], dtype="u1").reshape(len(faqs), 32),
+        "keyword_ptr": np.cumsum([0] + [len(faq["keywords"]) for faq in faqs], dtype="<u8"),
+        "keyword_spans": np.array(keyword_spans, dtype="<u8").reshape(len(keyword_spans), 2),
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(faqs), len(keyword_spans), len(blob)))
+            for name, _, _, offset in _sections(len(faqs), len(keyword_spans)):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(arrays[name].tobytes() if name != "blob" else bytes(blob))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class MappedText:
+    """An answer still in a mapped corpus file; ``str()`` decodes it.
+
+    Compares and hashes by the SHA-256 of the text, so the same answer is
+    equal across rebuilt files. When the file is replaced, :meth:`rebind`
+    moves it to the new mapping and :meth:`detach` keeps the text in
+    memory instead, so the old mapping can be released.
+    """
+
+    __slots__ = ("_location", "_length", "digest")
+
+    def __init__(self, corpus: "MappedCorpus", start: int, length: int, digest: bytes):
+        # (corpus, start), or the decoded text once detached; replaced in one
+        # assignment so concurrent readers see either the old or the new one.
+        self._location = corpus, start
+        self._length = length
+        self.digest = digest
+
+    def __str__(self) -> str:
+        location = self._location
+        if isinstance(location, str):
+            return location
+        corpus, start = location
+        return corpus.text(start, self._length)
+
+    def rebind(self, other: "MappedText"):
+        """Read from ``other``'s mapping from now on; the digests must match."""
+        if other.digest != self.digest:
+            raise ValueError("cannot rebind to a different text")
+        self._location = other._location
+
+    def detach(self):
+        """Hold the decoded text rather than a position in the mapping."""
+        self._location = str(self)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, MappedText) and other.digest == self.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __repr__(self) -> str:
+        return f"MappedText({self.digest.hex()[:12]}, {self._length} bytes)"
+
+
+class MappedCorpus(Sequence[dict]):
+    """A binary corpus file mapped into memory, read as FAQ dicts.
+
+    Opening it maps the file and checks the header; nothing is parsed.
+    Each FAQ dict is decoded on access, except its ``answer``, which is a
+    :class:`MappedText` decoded only when it is used. Processes mapping
+    the same file share its pages through the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{path}: not a binary FAQ corpus")
+        magic, version, count, n_keywords, blob_size = _HEADER.unpack_from(self._map)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{path}: not a version {BINARY_VERSION} binary FAQ corpus")
+        sections = _sections(count, n_keywords)
+        blob_offset = sections[-1][3]
+        if len(self._map) < blob_offset + blob_size:
+            raise ValueError(f"{path}: truncated binary FAQ corpus")
+        for name, dtype, shape, offset in sections[:-1]:
+            array = np.frombuffer(self._map, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+            setattr(self, f"_{name}", array.reshape(shape))
+        self._blob_offset = blob_offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def text(self, start: int, length: int) -> str:
+        """Decode ``length`` bytes of the string blob."""
+        start += self._blob_offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        (question, answer, source, source_name) = self._spans[i].tolist()
+        first, last = self._keyword_ptr[i:i + 2].tolist()
+        return {
+            "id": int(self._ids[i]),
+            "question": self.text(*question),
+            "answer": MappedText(self, answer[0], answer[1], self._digests[i].tobytes()),
+            "source": self.text(*source),
+            "source_name": self.text(*source_name),
+            "keywords": [self.text(start, length) for start, length in self._keyword_spans[first:last].tolist()],
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self._count):
+            yield self[i]
+
+
+def load_corpus(path: str = CORPUS_PATH) -> Sequence[dict]:
+    """Read FAQ dicts from a JSON array, a ``.jsonl`` file (one object per
+    line) or a compiled ``.bin`` file, which is mapped rather than read.
+
+    Raises ValueError if the file is malformed or an entry lacks a field.
+    """
+    if path.endswith(".bin"):
+        return MappedCorpus(path)
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            faqs = [json.loads(line) for line in f if line.strip()]
+        else:
+            faqs = json.load(f)
+    _validate(faqs, path)
+    return faqs
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # The inode changes when a new version is renamed into place.
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileWatcher:
+    """Polls a file and hands every new version, as ``load`` reads it, to ``on_change``.
+
+    ``on_change`` must cope with being given an unchanged version.
+
+    A version that fails to load is logged and skipped; whatever was built
+    from the previous one keeps serving until the file is fixed. With
+    ``optional``, a file that disappears is handed over as None.
+    """
+
+    def __init__(self, load: Callable[[str], object], on_change: Callable[..., None], path: str,
+                 interval: float, name: str, optional: bool = False):
+        self.path = path
+        self.interval = interval
+        self.name = name
+        self.optional = optional
+        self._load = load
+        self._on_change = on_change
+        # Unknown until the first check, which always loads: what is being
+        # served may predate the current file (e.g. in a freshly forked worker).
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last check; return whether it did."""
+        signature = _signature(self.path)
+        if signature == self._signature or (signature is None and not self.optional):
+            return False
+        self._signature = signature
+        try:
+            self._on_change(None if signature is None else self._load(self.path))
+        except Exception:
+            logger.exception("Could not reload %s from %s", self.name, self.path)
+            return False
+        return True
+
+    def start(self):
+        """Check once now, then keep polling in a daemon thread unless ``interval`` is 0.
+
+        The first check runs before returning, so a freshly forked worker
+        never serves the version its master booted with once it has started.
+        """
+        if self._thread is None:
+            self.check()
+            if self.interval > 0:
+                self._thread = threading.Thread(target=self._run, name=f"{self.name} watcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+
+class CorpusWatcher(FileWatcher):
+    """Polls the corpus file and hands every new version to ``on_change``.
+
+    ``on_change`` must cope with being given an unchanged corpus.
+
+    A version that fails to load or index is logged and skipped; the
+    previous index keeps serving until the file is fixed.
+    """
+
+    def __init__(self, on_change: Callable[[Sequence[dict]], None], path: str = CORPUS_PATH,
+                 interval: float = 2.0):
+        super().__init__(load_corpus, on_change, path, interval, "FAQ corpus")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a JSON/JSONL FAQ corpus into the mapped binary format.")
+    parser.add_argument("source", help="JSON or JSONL corpus")
+    parser.add_argument("output", help="binary corpus to write, e.g. data/faqs.bin")
+    args = parser.parse_args()
+
+    faqs = load_corpus(args.source)
+    write_binary_corpus(faqs, args.output)
+    print(f"{len(faqs)} FAQs -> {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
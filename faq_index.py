@@ -0,0 +1,260 @@
+"""
+Mutual Fund FAQ Assistant - FAQ Index
+Single corpus and prebuilt lookup tables shared by the CLI, Flask and Streamlit front ends.
+"""
+
+import hashlib
+import json
+import os
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from corpus import CORPUS_PATH, MappedText, load_corpus
+from fuzzy import DEFAULT_MAX_EDIT_DISTANCE, FuzzyMatcher
+from keyword_index import KeywordIndex
+from tokenizer import Vocabulary, normalize
+
+# Typo tolerance of the fallback used when no keyword matches exactly; 0 disables it.
+MAX_EDIT_DISTANCE = int(os.environ.get("MF_FAQ_MAX_EDIT_DISTANCE", DEFAULT_MAX_EDIT_DISTANCE))
+
+# (label, query) of the popular-topic chips in the web and Streamlit UIs.
+POPULAR_TOPICS = (
+    ("Expense Ratio", "expense ratio"),
+    ("Exit Load", "exit load"),
+    ("Minimum SIP", "minimum sip"),
+    ("ELSS Lock-in", "elss lock-in"),
+    ("Riskometer", "riskometer"),
+    ("Benchmark", "benchmark"),
+    ("Download Statement", "download statement"),
+    ("NAV", "nav"),
+    ("KYC", "kyc"),
+    ("AUM", "aum")
+)
+
+
+class FAQRecord(NamedTuple):
+    """Compact, immutable FAQ entry."""
+    id: int
+    question: str
+    answer: str
+    source: str
+    source_name: str
+    keywords: Tuple[str, ...]
+
+
+class MappedFAQRecord(FAQRecord):
+    """FAQ entry whose answer stays in the mapped corpus file until read."""
+    __slots__ = ()
+
+    @property
+    def answer(self) -> str:
+        return str(tuple.__getitem__(self, 2))
+
+
+def _record(faq: dict) -> FAQRecord:
+    record_type = MappedFAQRecord if isinstance(faq["answer"], MappedText) else FAQRecord
+    return record_type(
+        id=faq["id"],
+        question=faq["question"],
+        answer=faq["answer"],
+        source=faq["source"],
+        source_name=faq["source_name"],
+        keywords=tuple(normalize(keyword) for keyword in faq["keywords"]),
+    )
+
+
+def _digest(record: FAQRecord) -> bytes:
+    # Mapped answers contribute their stored SHA-256 instead of being decoded.
+    return hashlib.sha256(json.dumps(
+        record, ensure_ascii=False, default=lambda text: text.digest.hex()
+    ).encode("utf-8")).digest()
+
+
+class FAQIndex:
+    """Immutable FAQ index built once per corpus version.
+
+    Holds the records in corpus order together with an id -> record map,
+    the normalized keywords, the token vocabulary and inverted keyword
+    index used by :meth:`search`, and a ``version`` hash of the corpus
+    content. The typo-tolerant matchers are built on first use.
+
+    Internally every FAQ has a slot that survives edits to other FAQs, so
+    :meth:`updated` only re-indexes the FAQs that were added, changed or
+    removed.
+    """
+
+    __slots__ = (
+        "records", "by_id", "keywords", "vocabulary", "matcher", "version", "_fuzzy",
+        "_slot_faqs", "_slot_records", "_slot_digests", "_slot_by_id", "_positions"
+    )
+
+    def __init__(self, faqs: Iterable[dict]):
+        faqs = list(faqs)
+        records = tuple(_record(faq) for faq in faqs)
+        positions = list(range(len(records)))
+        vocabulary = Vocabulary()
+        self._assemble(
+            positions, faqs, list(records), [_digest(record) for record in records],
+            {record.id: slot for slot, record in enumerate(records)}, positions, vocabulary,
+            KeywordIndex([record.keywords for record in records], vocabulary, positions), {}
+        )
+
+    def _assemble(self, order, slot_faqs, slot_records, slot_digests, slot_by_id, positions,
+                  vocabulary, matcher, fuzzy):
+        records = tuple(slot_records[slot] for slot in order)
+        _set = object.__setattr__
+        _set(self, "records", records)
+        _set(self, "by_id", MappingProxyType({record.id: record for record in records}))
+        _set(self, "keywords", tuple(record.keywords for record in records))
+        _set(self, "vocabulary", vocabulary)
+        _set(self, "matcher", matcher)
+        _set(self, "version", hashlib.sha256(
+            b"".join(slot_digests[slot] for slot in order)
+        ).hexdigest()[:16])
+        _set(self, "_fuzzy", fuzzy)
+        _set(self, "_slot_faqs", slot_faqs)
+        _set(self, "_slot_records", slot_records)
+        _set(self, "_slot_digests", slot_digests)
+        _set(self, "_slot_by_id", slot_by_id)
+        _set(self, "_positions", positions)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FAQIndex is immutable")
+
+    def updated(self, faqs: Iterable[dict]) -> "FAQIndex":
+        """Return the index for a new version of the corpus.
+
+        FAQs are matched to the current ones by id; only added, changed and
+        removed FAQs are normalized and (re-)indexed, and unchanged records
+        are shared with this index. Returns ``self`` if nothing changed.
+        This index is never modified, so it can keep serving meanwhile.
+        """
+        faqs = list(faqs)
+        slot_faqs = list(self._slot_faqs)
+        slot_records = list(self._slot_records)
+        slot_digests = list(self._slot_digests)
+        slot_by_id = dict(self._slot_by_id)
+        removed: Dict[int, Tuple[str, ...]] = {}
+        added: Dict[int, Tuple[str, ...]] = {}
+        order: List[int] = []
+        seen = set()
+
+        for faq in faqs:
+            slot = slot_by_id.get(faq["id"])
+            if slot is not None and slot not in seen and slot_faqs[slot] == faq:
+                answer = tuple.__getitem__(slot_records[slot], 2)
+                if isinstance(answer, MappedText) and answer is not faq["answer"]:
+                    answer.rebind(faq["answer"])
+                order.append(slot)
+                seen.add(slot)
+                continue
+            if slot is not None and slot not in seen:
+                removed[slot] = slot_records[slot].keywords
+            else:
+                slot = len(slot_records)
+                slot_faqs.append(None)
+                slot_records.append(None)
+                slot_digests.append(b"")
+            record = _record(faq)
+            slot_faqs[slot] = faq
+            slot_records[slot] = record
+            slot_digests[slot] = _digest(record)
+            slot_by_id[record.id] = slot
+            added[slot] = record.keywords
+            order.append(slot)
+            seen.add(slot)
+
+        for slot, record in enumerate(self._slot_records):
+            if record is not None and slot not in seen:
+                removed[slot] = record.keywords
+                slot_faqs[slot] = slot_records[slot] = None
+                if slot_by_id.get(record.id) == slot:
+                    del slot_by_id[record.id]
+        # Unchanged answers now read from the new file; the replaced ones
+        # keep their text, so nothing refers to the old mapping any more.
+        for slot in removed:
+            answer = tuple.__getitem__(self._slot_records[slot], 2)
+            if isinstance(answer, MappedText):
+                answer.detach()
+
+        if not added and not removed and all(self._positions[slot] == i for i, slot in enumerate(order)):
+            return self
+        if len(slot_records) > 2 * len(order) + 64:
+            return FAQIndex(faqs)  # mostly removed slots; start afresh
+
+        positions = [-1] * len(slot_records)
+        for position, slot in enumerate(order):
+            positions[slot] = position
+        index = object.__new__(FAQIndex)
+        index._assemble(
+            order, slot_faqs, slot_records, slot_digests,
+            slot_by_id, positions, self.vocabulary, self.matcher.updated(removed, added, positions),
+            {distance: matcher.updated(removed, added, positions)
+             for distance, matcher in dict(self._fuzzy).items()}
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[FAQRecord]:
+        return iter(self.records)
+
+    @property
+    def mapped(self) -> bool:
+        """Whether the answers are read from a mapped corpus file on demand."""
+        return bool(self.records) and isinstance(self.records[0], MappedFAQRecord)
+
+    def get(self, faq_id: int) -> Optional[FAQRecord]:
+        """Return the FAQ with the given id, if any."""
+        return self.by_id.get(faq_id)
+
+    def fuzzy_matcher(self, max_edit_distance: int = MAX_EDIT_DISTANCE) -> FuzzyMatcher:
+        """Return the (lazily built) typo-tolerant matcher for this index."""
+        matcher = self._fuzzy.get(max_edit_distance)
+        if matcher is None:
+            keyword_lists = [record.keywords if record else () for record in self._slot_records]
+            matcher = self._fuzzy.setdefault(
+                max_edit_distance, FuzzyMatcher(keyword_lists, max_edit_distance, self._positions)
+            )
+        return matcher
+
+    def match(self, query: str, max_edit_distance: int = MAX_EDIT_DISTANCE) -> Tuple[Optional[FAQRecord], int]:
+        """Return the best matching FAQ and its keyword score.
+
+        Falls back to keywords within ``max_edit_distance`` edits when no
+        keyword occurs in the query exactly.
+        """
+        query = normalize(query)
+        best_idx, best_score = self.matcher.best_match(query)
+        if best_idx is None and max_edit_distance > 0:
+            best_idx, best_score = self.fuzzy_matcher(max_edit_distance).best_match(query)
+        if best_idx is None:
+            return None, 0
+        return self.records[best_idx], best_score
+
+    def search(self, query: str, max_edit_distance: int = MAX_EDIT_DISTANCE) -> Optional[FAQRecord]:
+        """Find the best matching FAQ for the given query."""
+        return self.match(query, max_edit_distance)[0]
+
+
+# Edited in data/faqs.json (or the file named by MF_FAQ_CORPUS), not here.
+# A compiled .bin corpus is mapped, not loaded; see corpus.py.
+FAQ_INDEX = FAQIndex(load_corpus(CORPUS_PATH))
+
+_current_index = FAQ_INDEX
+
+
+def current_index() -> FAQIndex:
+    """The index to serve from; replaced as a whole when the corpus is reloaded.
+
+    Read it once per request and use that index throughout, so a request
+    never mixes two corpus versions.
+    """
+    return _current_index
+
+
+def swap_index(index: FAQIndex):
+    """Make ``index`` the one returned by :func:`current_index`."""
+    global _current_index
+    _current_index = index
@@ -0,0 +1,191 @@
+"""
+Mutual Fund FAQ Assistant - Fuzzy Matcher
+Typo-tolerant keyword matching backed by a precomputed symmetric-delete dictionary.
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from keyword_index import best_faq
+
+DEFAULT_MAX_EDIT_DISTANCE = 2
+
+
+def allowed_distance(length: int, max_edit_distance: int) -> int:
+    """Edits tolerated for a string of ``length`` characters.
+
+    Short keywords such as "nav", "ter" or "pan" are one or two edits away
+    from ordinary words, so they only ever match exactly.
+    """
+    if length <= 4:
+        return 0
+    if length <= 8:
+        return min(1, max_edit_distance)
+    return max_edit_distance
+
+
+def _deletes(text: str, distance: int) -> Set[str]:
+    variants = {text}
+    frontier = {text}
+    for _ in range(distance):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once).
+
+    Returns ``limit + 1`` as soon as the distance is known to exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyMatcher:
+    """Finds keywords whose words are each within a small edit distance of the query's.
+
+    Every distinct keyword word is indexed under all strings obtained by
+    deleting up to its allowed number of characters. A query word goes
+    through the same expansion, so candidate words are found by dictionary
+    lookups instead of comparing the query against every keyword; only
+    those candidates are verified with a real edit-distance check.
+    Multi-word keywords match when consecutive query words match their
+    words in order. Matched keywords score ``len(keyword)`` like the exact
+    matcher.
+
+    Like :class:`~keyword_index.KeywordIndex`, FAQs are indexed by slot and
+    :meth:`updated` patches a copy for the changed slots only.
+    """
+
+    def __init__(self, keyword_lists: Sequence[Sequence[str]],
+                 max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE,
+                 positions: Optional[Sequence[int]] = None):
+        self.max_edit_distance = max_edit_distance
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._deletes: Dict[str, List[int]] = {}
+        self._phrases: Dict[int, List[Tuple[Tuple[int, ...], int]]] = {}
+        self._keyword_ids: Dict[str, int] = {}
+        self._postings: List[List[Tuple[int, int]]] = []
+        self._positions = positions if positions is not None else range(len(keyword_lists))
+        # ids of the lists this matcher may append to; None while nothing is shared.
+        self._owned: Optional[Set[int]] = None
+
+        for slot, keywords in enumerate(keyword_lists):
+            self._add(slot, keywords)
+
+    def _own(self, container, key) -> list:
+        """Return ``container[key]`` as a list safe to append to, copying a shared one."""
+        items = container[key]
+        if self._owned is not None and id(items) not in self._owned:
+            items = container[key] = list(items)
+            self._owned.add(id(items))
+        return items
+
+    def _add(self, slot: int, keywords: Sequence[str]):
+        for keyword in keywords:
+            if not keyword:
+                continue
+            keyword_id = self._keyword_ids.get(keyword)
+            if keyword_id is None:
+                keyword_id = self._keyword_ids[keyword] = len(self._postings)
+                self._postings.append([])
+                phrase = tuple(self._word_id(word) for word in keyword.split())
+                self._phrases.setdefault(phrase[0], [])
+                self._own(self._phrases, phrase[0]).append((phrase, keyword_id))
+            self._own(self._postings, keyword_id).append((slot, len(keyword)))
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self._words)
+            self._words.append(word)
+            for variant in _deletes(word, allowed_distance(len(word), self.max_edit_distance)):
+                self._deletes.setdefault(variant, [])
+                self._own(self._deletes, variant).append(word_id)
+        return word_id
+
+    def updated(self, removed: Mapping[int, Sequence[str]], added: Mapping[int, Sequence[str]],
+                positions: Sequence[int]) -> "FuzzyMatcher":
+        """Return a copy with the ``removed`` slots' keywords dropped and ``added`` ones indexed.
+
+        Words of removed keywords stay in the delete dictionary; they no
+        longer lead to any FAQ.
+        """
+        matcher = object.__new__(FuzzyMatcher)
+        matcher.max_edit_distance = self.max_edit_distance
+        matcher._words = list(self._words)
+        matcher._word_ids = dict(self._word_ids)
+        matcher._deletes = dict(self._deletes)
+        matcher._phrases = dict(self._phrases)
+        matcher._keyword_ids = dict(self._keyword_ids)
+        matcher._postings = list(self._postings)
+        matcher._positions = positions
+        matcher._owned = set()
+
+        for slot, keywords in removed.items():
+            for keyword in keywords:
+                keyword_id = matcher._keyword_ids.get(keyword)
+                if keyword_id is not None:
+                    postings = [p for p in matcher._postings[keyword_id] if p[0] != slot]
+                    matcher._postings[keyword_id] = postings
+                    matcher._owned.add(id(postings))
+        for slot, keywords in added.items():
+            matcher._add(slot, keywords)
+        matcher._owned = None
+        return matcher
+
+    def _candidates(self, word: str) -> Set[int]:
+        distance = allowed_distance(len(word), self.max_edit_distance)
+        found = set()
+        for variant in _deletes(word, distance):
+            for word_id in self._deletes.get(variant, ()):
+                if word_id in found:
+                    continue
+                candidate = self._words[word_id]
+                limit = min(distance, allowed_distance(len(candidate), self.max_edit_distance))
+                if candidate == word or (limit and edit_distance(word, candidate, limit) <= limit):
+                    found.add(word_id)
+        return found
+
+    def scan(self, text: str) -> Set[int]:
+        """Return the ids of keywords matched word by word within edit distance."""
+        words = text.split()
+        candidates = [self._candidates(word) for word in words]
+        found: Set[int] = set()
+        for start, word_ids in enumerate(candidates):
+            for word_id in word_ids:
+                for phrase, keyword_id in self._phrases.get(word_id, ()):
+                    if keyword_id in found or start + len(phrase) > len(words):
+                        continue
+                    if all(phrase[j] in candidates[start + j] for j in range(1, len(phrase))):
+                        found.add(keyword_id)
+        return found
+
+    def best_match(self, text: str) -> Tuple[Optional[int], int]:
+        """Return ``(faq_index, score)`` of the best FAQ, or ``(None, 0)``."""
+        scores: Dict[int, int] = {}
+        for keyword_id in self.scan(text):
+            for slot, weight in self._postings[keyword_id]:
+                scores[slot] = scores.get(slot, 0) + weight
+        return best_faq(scores, self._positions)
@@ -0,0 +1,50 @@
+"""
+Mutual Fund FAQ Assistant - Production Server
+Gunicorn settings: the FAQ index is built and warmed once in the master,
+then one worker per core is forked and shares it copy-on-write.
+
+    gunicorn -c gunicorn.conf.py
+
+Send HUP to the master for a graceful restart of all workers, TTIN/TTOU to
+add or remove a worker. Corpus edits are picked up by every worker without
+a restart; new code needs a full restart, or USR2 followed by QUIT to the
+old master for a zero-downtime upgrade.
+"""
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get("MF_FAQ_APP", "app:app")
+bind = os.environ.get("MF_FAQ_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("MF_FAQ_WORKERS", multiprocessing.cpu_count()))
+worker_class = os.environ.get("MF_FAQ_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("MF_FAQ_THREADS", 4))
+
+# Import the app (and build the index) in the master before forking.
+preload_app = True
+graceful_timeout = 30
+keepalive = 5
+max_requests = 0
+
+
+def when_ready(server):
+    """Warm up in the master, then freeze the heap so GC never dirties the shared pages."""
+    from app import admission, warm_up
+
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("FAQ index warmed up; forking %d workers", server.num_workers)
+    if worker_class == "gthread" and 0 < threads <= admission.max_concurrent:
+        server.log.warning("MF_FAQ_ADMISSION_MAX_CONCURRENT=%d never sheds with %d threads per worker; "
+                           "use fewer slots than threads", admission.max_concurrent, threads)
+
+
+def post_fork(server, worker):
+    """Threads do not survive the fork, so each worker polls the corpus, scheme
+    master and NAV store itself, starting with a check that catches up on
+    edits made since the master booted."""
+    from app import start_watchers
+
+    start_watchers()
@@ -0,0 +1,131 @@
+"""
+Mutual Fund FAQ Assistant - Keyword Index
+Inverted index from keyword token n-grams to FAQs.
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from tokenizer import Vocabulary
+
+
+class KeywordIndex:
+    """Maps each keyword, as a phrase of interned token ids, to its FAQs.
+
+    Keywords only match on token boundaries: "ter" no longer hits
+    "interest" and "nav" no longer hits "canvas", while multi-word keywords
+    such as "total expense ratio" still match as phrases. A query only
+    looks up the n-grams that start at one of its own tokens and are no
+    longer than the longest keyword starting with that token. Every
+    matched keyword adds ``len(keyword)`` to its FAQ, and the first FAQ
+    with the highest score wins.
+
+    FAQs are indexed by slot, a number that stays fixed while the corpus
+    is edited; ``positions`` maps each slot to its FAQ's place in corpus
+    order (-1 once removed). :meth:`updated` patches a copy of the index
+    for a few changed slots instead of re-indexing every keyword.
+    """
+
+    def __init__(self, keyword_lists: Sequence[Sequence[str]], vocabulary: Vocabulary,
+                 positions: Optional[Sequence[int]] = None):
+        self._vocabulary = vocabulary
+        self._phrases: Dict[Tuple[int, ...], int] = {}
+        self._longest: Dict[int, int] = {}
+        self._postings: List[List[Tuple[int, int]]] = []
+        self._positions = positions if positions is not None else range(len(keyword_lists))
+
+        for slot, keywords in enumerate(keyword_lists):
+            self._add(slot, keywords, None)
+
+    def _add(self, slot: int, keywords: Sequence[str], copied: Optional[Set[int]]):
+        for keyword in keywords:
+            tokens = keyword.split()
+            if not tokens:
+                continue
+            phrase = tuple(self._vocabulary.intern(token) for token in tokens)
+            keyword_id = self._phrases.get(phrase)
+            if keyword_id is None:
+                keyword_id = self._phrases[phrase] = len(self._postings)
+                self._postings.append([])
+                self._longest[phrase[0]] = max(self._longest.get(phrase[0], 0), len(phrase))
+            elif copied is not None and keyword_id not in copied:
+                # Postings lists are shared with the index being updated.
+                self._postings[keyword_id] = list(self._postings[keyword_id])
+            if copied is not None:
+                copied.add(keyword_id)
+            self._postings[keyword_id].append((slot, len(keyword)))
+
+    def updated(self, removed: Mapping[int, Sequence[str]], added: Mapping[int, Sequence[str]],
+                positions: Sequence[int]) -> "KeywordIndex":
+        """Return a copy with the ``removed`` slots' keywords dropped and ``added`` ones indexed.
+
+        A changed FAQ appears in both with the same slot. This index is left
+        untouched, so requests still using it are unaffected; the shared
+        vocabulary only ever grows.
+        """
+        index = object.__new__(KeywordIndex)
+        index._vocabulary = self._vocabulary
+        index._phrases = dict(self._phrases)
+        index._longest = dict(self._longest)
+        index._postings = list(self._postings)
+        index._positions = positions
+
+        copied: Set[int] = set()
+        for slot, keywords in removed.items():
+            for keyword in keywords:
+                keyword_id = self._phrases.get(tuple(self._vocabulary.encode(keyword.split())))
+                if keyword_id is not None:
+                    index._postings[keyword_id] = [p for p in index._postings[keyword_id] if p[0] != slot]
+                    copied.add(keyword_id)
+        for slot, keywords in added.items():
+            index._add(slot, keywords, copied)
+        return index
+
+    @property
+    def postings(self) -> List[List[Tuple[int, int]]]:
+        """``(slot, weight)`` pairs for each keyword id returned by :meth:`scan`."""
+        return self._postings
+
+    @property
+    def phrases(self) -> Mapping[Tuple[int, ...], int]:
+        """Keyword id of each keyword, as the tuple of its token ids."""
+        return self._phrases
+
+    @property
+    def positions(self) -> Sequence[int]:
+        """Corpus position of the FAQ in each slot."""
+        return self._positions
+
+    def scan(self, text: str) -> Set[int]:
+        """Return the ids of every keyword occurring as a phrase in normalized ``text``."""
+        token_ids = self._vocabulary.encode(text.split())
+        phrases, longest = self._phrases, self._longest
+        found = set()
+        for start, token_id in enumerate(token_ids):
+            max_length = longest.get(token_id)
+            if not max_length:
+                continue
+            for end in range(start + 1, min(start + max_length, len(token_ids)) + 1):
+                keyword_id = phrases.get(tuple(token_ids[start:end]))
+                if keyword_id is not None:
+                    found.add(keyword_id)
+        return found
+
+    def best_match(self, text: str) -> Tuple[Optional[int], int]:
+        """Return ``(faq_index, score)`` of the best FAQ, or ``(None, 0)``."""
+        scores: Dict[int, int] = {}
+        for keyword_id in self.scan(text):
+            for slot, weight in self._postings[keyword_id]:
+                scores[slot] = scores.get(slot, 0) + weight
+        return best_faq(scores, self._positions)
+
+
+def best_faq(scores: Dict[int, int], positions: Sequence[int]) -> Tuple[Optional[int], int]:
+    """Pick ``(faq_index, score)`` from per-slot scores; ties go to the FAQ first in corpus order."""
+    best_idx = None
+    best_score = 0
+    for slot, score in scores.items():
+        faq_idx = positions[slot]
+        if score > best_score or (score == best_score and best_idx is not None and faq_idx < best_idx):
+            best_idx = faq_idx
+            best_score = score
+    return best_idx, best_score
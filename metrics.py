@@ -0,0 +1,162 @@
+"""
+Mutual Fund FAQ Assistant - Metrics
+Per-thread sharded counters and histograms rendered in Prometheus text format.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, List, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class _Sharded:
+    """Base for metrics whose hot path only touches the calling thread's shard.
+
+    Recording is a dict update on a shard no other thread writes to, so it
+    needs no lock; the lock is only taken when a thread records for the
+    first time and when the shards are summed for a scrape. Shards of
+    threads that have exited are folded into one retired shard so
+    thread-per-request servers do not accumulate them.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _retire_dead_shards(self):
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = alive
+
+    def _merge(self, total: dict, shard: dict):
+        raise NotImplementedError
+
+    def _totals(self) -> dict:
+        with self._lock:
+            self._retire_dead_shards()
+            totals = self._merge({}, self._retired)
+            for _, shard in self._shards:
+                # dict.copy() is atomic under the GIL, unlike iterating a dict
+                # its owning thread may be growing.
+                self._merge(totals, shard.copy())
+        return totals
+
+    def _label_text(self, labels: Labels, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Sharded):
+    """Monotonic counter, optionally split by label values."""
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, total: dict, shard: dict) -> dict:
+        for labels, value in shard.items():
+            total[labels] = total.get(labels, 0) + value
+        return total
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._totals().items()):
+            lines.append(f"{self.name}{self._label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Sharded):
+    """Histogram with fixed upper bounds, optionally split by label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket plus +Inf, then the sum of observed values.
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self, total: dict, shard: dict) -> dict:
+        for labels, counts in shard.items():
+            merged = total.get(labels)
+            if merged is None:
+                total[labels] = list(counts)
+            else:
+                for i, count in enumerate(counts):
+                    merged[i] += count
+        return total
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = self._label_text(labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_number(counts[-1])}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time.
+
+    ``metric_type="counter"`` exposes a count kept elsewhere (such as the
+    result cache's hit counter) without copying it on every request.
+    """
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float],
+                 metric_type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self._read = read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}",
+                f"{self.name} {_number(self._read())}"]
+
+
+def render(metrics) -> str:
+    """Prometheus text exposition of ``metrics``."""
+    return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Mutual Fund FAQ Assistant - NAV Data
+Streaming ingestion of AMFI NAV files into columnar arrays, and NAV lookups.
+
+    python nav.py NAVAll.txt [NAV-history.txt ...] [--output data/nav.npz]
+"""
+
+import argparse
+import os
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from corpus import FileWatcher
+
+NAV_PATH = os.environ.get(
+    "MF_FAQ_NAV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nav.npz")
+)
+
+_EPOCH = date(1970, 1, 1)
+_READ_SIZE = 1 << 24
+
+
+class Scheme(NamedTuple):
+    """What the NAV files say about a scheme, from its latest line."""
+    code: int
+    name: str
+    category: str
+    fund_house: str
+
+
+def _day(text: bytes, cache: Dict[bytes, int]) -> int:
+    """Days since 1970-01-01 of an AMFI date such as ``17-Oct-2024``."""
+    day = cache.get(text)
+    if day is None:
+        day = cache[text] = (datetime.strptime(text.decode("ascii"), "%d-%b-%Y").date() - _EPOCH).days
+    return day
+
+
+def _blocks(path: str) -> Iterable[bytes]:
+    """The file in blocks of about ``_READ_SIZE`` bytes, each ending with a line break."""
+    with open(path, "rb") as f:
+        rest = b""
+        while True:
+            block = f.read(_READ_SIZE)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            rest = block[cut:]
+            if cut:
+                yield block[:cut]
+        if rest:
+            yield rest + b"\n"
+
+
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[list(b" \t\r\n\x0b\x0c")] = True
+_IS_DIGIT = np.zeros(256, dtype=bool)
+_IS_DIGIT[list(b"0123456789")] = True
+# Lower-cased three-letter month names packed into an int, and their month numbers.
+_MONTH_KEYS, _MONTH_NUMBERS = (np.array(column) for column in zip(*sorted(
+    (int.from_bytes(datetime(2000, month, 1).strftime("%b").lower().encode("ascii"), "big"), month)
+    for month in range(1, 13)
+)))
+# Digits a float64 holds exactly; longer numbers go through int() / float().
+_MAX_DIGITS = 15
+
+
+def _strip(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Field bounds without surrounding whitespace."""
+    while True:
+        lead = (starts < ends) & _SPACE[buf[starts]]
+        trail = (starts < ends) & _SPACE[buf[ends - 1]]
+        if not (lead.any() or trail.any()):
+            return starts, ends
+        starts, ends = starts + lead, ends - trail
+
+
+def _parse_decimals(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, max_digits: int,
+                    fraction: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Values of plain ``123`` (or, with ``fraction``, ``123.4567``) fields, and which fields were.
+
+    The digits are accumulated column by column into an exact integer,
+    which is divided by a power of ten once, so the result rounds exactly
+    like ``float()``. Anything else (signs, spaces, "N.A.", too many
+    digits) is left to the caller.
+    """
+    lengths = ends - starts
+    width = min(max_digits + fraction, int(lengths.max(initial=0)))
+    valid = (lengths > 0) & (lengths <= width)
+    values = np.zeros(len(starts), dtype=np.int64)
+    decimals = np.zeros(len(starts), dtype=np.int64)
+    after_dot = np.zeros(len(starts), dtype=bool)
+    for j in range(width):
+        column = buf[starts + j]
+        inside = j < lengths
+        digit = _IS_DIGIT[column] & inside
+        if fraction:
+            dot = (column == ord(".")) & inside & ~after_dot
+            valid &= digit | dot | ~inside
+            decimals += digit & after_dot
+            after_dot |= dot
+        else:
+            valid &= digit | ~inside
+        values = np.where(digit, values * 10 + (column - ord("0")), values)
+    valid &= lengths > after_dot  # a digit besides the dot
+    return (values / 10.0 ** decimals if fraction else values), valid
+
+
+def _parse_days(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Days since 1970-01-01 of ``dd-Mon-yyyy`` fields, and which fields were valid dates."""
+    chars = buf[starts + np.arange(11)[:, None]]
+    valid = ((ends - starts == 11) & (chars[2] == ord("-")) & (chars[6] == ord("-"))
+             & _IS_DIGIT[chars[[0, 1, 7, 8, 9, 10]]].all(axis=0))
+    digits = chars[[0, 1, 7, 8, 9, 10]].astype(np.int64) - ord("0")
+    letters = chars[3:6].astype(np.int64) | 0x20
+    keys = (letters[0] << 16) | (letters[1] << 8) | letters[2]
+    found = np.minimum(np.searchsorted(_MONTH_KEYS, keys), len(_MONTH_KEYS) - 1)
+    valid &= _MONTH_KEYS[found] == keys
+    day = digits[0] * 10 + digits[1]
+    year = digits[2] * 1000 + digits[3] * 100 + digits[4] * 10 + digits[5]
+    months = np.where(valid, (year - 1970) * 12 + _MONTH_NUMBERS[found] - 1, 0)
+    first = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    following = (months + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    days = first + day - 1
+    return days, valid & (day >= 1) & (year >= 1) & (days < following)
+
+
+class _FileParser:
+    """Parses one NAV file block by block, keeping the header state in between.
+
+    Lines starting with a digit and holding a semicolon are data rows; they
+    are split and converted with vectorized byte scans over the whole block. The rest (column,
+    category and fund-house headers, blank lines) and the few rows the
+    scans cannot convert exactly (such as "N.A." NAVs) go through
+    :meth:`_parse_line`.
+    """
+
+    def __init__(self, date_cache: Dict[bytes, int]):
+        self.columns: Optional[Tuple[int, int, int, int]] = None
+        self.category = self.fund_house = ""
+        self._date_cache = date_cache
+
+    def _header(self, line: bytes) -> bool:
+        """Apply a non-data line; return whether it was one."""
+        if b";" not in line:
+            # "Open Ended Schemes(Debt Scheme - Banking and PSU Fund)", then fund houses.
+            text = line.decode("utf-8", "replace")
+            if "Schemes" in text:
+                self.category = text
+            else:
+                self.fund_house = text
+            return True
+        fields = line.split(b";")
+        if self.columns is None or fields[0].strip().lower() == b"scheme code":
+            header = [field.strip().lower() for field in fields]
+            if header[0] == b"scheme code":
+                self.columns = (len(header), header.index(b"scheme name"),
+                                header.index(b"net asset value"), header.index(b"date"))
+            return True
+        return False
+
+    def _parse_line(self, line: bytes) -> Optional[Tuple[int, int, float, bytes]]:
+        """``(code, day, nav, name)`` of a data line; headers update the state."""
+        line = line.strip()
+        if not line or self._header(line):
+            return None
+        return self._row(line, self.columns)
+
+    def _row(self, line: bytes, columns: Tuple[int, int, int, int]) -> Optional[Tuple[int, int, float, bytes]]:
+        width, name_column, nav_column, date_column = columns
+        fields = line.split(b";")
+        if len(fields) < width:
+            return None
+        try:
+            code = int(fields[0])
+            row = code, _day(fields[date_column].strip(), self._date_cache), float(fields[nav_column])
+        except ValueError:  # "N.A." NAVs and malformed lines
+            return None
+        if not -2 ** 31 <= code < 2 ** 31:  # does not fit the code column
+            return None
+        return row + (fields[name_column],)
+
+    def parse(self, block: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[int, Tuple[int, bytes, str, str]]]:
+        """``(codes, days, navs)`` of the block's rows in file order, and the
+        (day, name, category, fund house) of each scheme's latest row."""
+        size = len(block)
+        # Zero padding lets the fixed-width scans read past the last field.
+        buf = np.frombuffer(block + bytes(_MAX_DIGITS + 1), dtype=np.uint8)
+        ends = np.flatnonzero(buf[:size] == ord("\n"))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        semicolons = np.flatnonzero(buf[:size] == ord(";"))
+        # Field k of a line runs from after its k-th semicolon to its (k + 1)-th.
+        before = np.searchsorted(semicolons, starts)
+        count = np.searchsorted(semicolons, ends) - before
+        # Fund houses can start with a digit too ("360 ONE Mutual Fund").
+        rows = _IS_DIGIT[buf[starts]] & (count > 0)
+
+        # Header lines are few; walk them in order, noting where each takes effect.
+        # Data rows are parsed between column headers, each run with its columns.
+        labels = [(-1, self.category, self.fund_house)]
+        runs = [(0, self.columns)]
+        slow: List[Tuple[int, Tuple[int, int, float, bytes]]] = []
+        for i in np.flatnonzero(~rows & (ends > starts)).tolist():
+            columns = self.columns
+            parsed = self._parse_line(block[starts[i]:ends[i]])
+            if parsed:
+                slow.append((i, parsed))
+            labels.append((i, self.category, self.fund_house))
+            if self.columns != columns:
+                runs.append((i, self.columns))
+        runs.append((len(starts), None))
+
+        lines, codes, days, navs, names = [], [], [], [], []
+        for (first, columns), (last, _) in zip(runs, runs[1:]):
+            if columns is None:
+                continue
+            width, name_column, nav_column, date_column = columns
+            run = np.flatnonzero(rows[first:last] & (count[first:last] >= width - 1)) + first
+            line_starts, line_ends, line_before, line_count = starts[run], ends[run], before[run], count[run]
+            padded = np.append(semicolons, size)
+
+            def field(k):
+                field_starts = line_starts if k == 0 else padded[line_before + k - 1] + 1
+                return field_starts, np.where(k < line_count, padded[line_before + k], line_ends)
+
+            # Codes of up to 9 digits fit the int32 column.
+            row_codes, code_valid = _parse_decimals(buf, *field(0), 9, fraction=False)
+            row_navs, nav_valid = _parse_decimals(buf, *field(nav_column), _MAX_DIGITS, fraction=True)
+            row_days, day_valid = _parse_days(buf, *_strip(buf, *field(date_column)))
+            valid = code_valid & nav_valid & day_valid
+            for i in run[~valid].tolist():
+                parsed = self._row(block[starts[i]:ends[i]].strip(), columns)
+                if parsed:
+                    slow.append((i, parsed))
+            name_starts, name_ends = field(name_column)
+            lines.append(run[valid])
+            codes.append(row_codes[valid])
+            days.append(row_days[valid])
+            navs.append(row_navs[valid])
+            names.append(np.stack((name_starts[valid], name_ends[valid]), axis=1))
+
+        if slow:
+            lines.append(np.array([i for i, _ in slow], dtype=np.int64))
+            codes.append(np.array([parsed[0] for _, parsed in slow], dtype=np.int64))
+            days.append(np.array([parsed[1] for _, parsed in slow], dtype=np.int64))
+            navs.append(np.array([parsed[2] for _, parsed in slow], dtype=np.float64))
+            names.append(np.full((len(slow), 2), -1, dtype=np.int64))
+        if not sum(map(len, lines)):
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty, np.zeros(0, dtype=np.float64), {}
+        lines, codes, days, navs, names = (np.concatenate(parts) for parts in (lines, codes, days, navs, names))
+        if slow or len(runs) > 2:
+            order = np.argsort(lines, kind="stable")
+            lines, codes, days, navs, names = lines[order], codes[order], days[order], navs[order], names[order]
+
+        # Each scheme's latest row; on equal days the later line wins.
+        order = np.lexsort((lines, days, codes))
+        latest = order[np.append(codes[order][1:] != codes[order][:-1], True)]
+        slow_names = {i: parsed[3] for i, parsed in slow}
+        label_lines = [i for i, _, _ in labels]
+        info = {}
+        for row in latest.tolist():
+            line = int(lines[row])
+            name_start, name_end = names[row].tolist()
+            name = slow_names[line] if name_start < 0 else block[name_start:name_end]
+            _, category, fund_house = labels[bisect_right(label_lines, line) - 1]
+            info[int(codes[row])] = (int(days[row]), name, category, fund_house)
+        return codes.astype(np.int32), days.astype(np.int32), navs, info
+
+
+class NAVStore:
+    """NAVs of every scheme, stored column-wise and sorted by (scheme code, date).
+
+    ``codes`` holds the distinct scheme codes in ascending order; the NAVs
+    of ``codes[i]`` are rows ``starts[i]:starts[i + 1]`` of ``days`` (days
+    since 1970-01-01) and ``navs``. Scheme names, categories and fund
+    houses sit in one UTF-8 blob. Lookups find the scheme through a dict
+    and the dates by bisection.
+    """
+
+    def __init__(self, codes: np.ndarray, starts: np.ndarray, days: np.ndarray, navs: np.ndarray,
+                 info_blob: np.ndarray, info_offsets: np.ndarray):
+        self.codes = codes
+        self.starts = starts
+        self.days = days
+        self.navs = navs
+        self._info_blob = info_blob.tobytes()
+        self._info_offsets = info_offsets.tolist()
+        self._positions = {code: i for i, code in enumerate(codes.tolist())}
+
+    @classmethod
+    def ingest(cls, paths: Iterable[str]) -> "NAVStore":
+        """Parse AMFI NAVAll / NAV history files (semicolon-separated, with
+        scheme-category and fund-house header lines) into a store.
+
+        Files are streamed in blocks, each parsed with NumPy scans rather
+        than line by line; what is kept is 16 bytes per NAV row plus the
+        scheme details, however large the files are. Where files overlap,
+        the later one wins.
+        """
+        codes: List[np.ndarray] = []
+        days: List[np.ndarray] = []
+        navs: List[np.ndarray] = []
+        # Scheme details from each scheme's latest line: (day, name, category, fund house).
+        info: Dict[int, Tuple[int, bytes, str, str]] = {}
+        date_cache: Dict[bytes, int] = {}
+        for path in paths:
+            parser = _FileParser(date_cache)
+            for block in _blocks(path):
+                block_codes, block_days, block_navs, block_info = parser.parse(block)
+                codes.append(block_codes)
+                days.append(block_days)
+                navs.append(block_navs)
+                for code, latest in block_info.items():
+                    if code not in info or latest[0] >= info[code][0]:
+                        info[code] = latest
+        return cls._build(np.concatenate(codes or [np.zeros(0, dtype=np.int32)]),
+                          np.concatenate(days or [np.zeros(0, dtype=np.int32)]),
+                          np.concatenate(navs or [np.zeros(0, dtype=np.float64)]), {
+                              code: (name.decode("utf-8", "replace").strip(), category, fund_house)
+                              for code, (_, name, category, fund_house) in info.items()
+                          })
+
+    @classmethod
+    def _build(cls, codes: np.ndarray, days: np.ndarray, navs: np.ndarray,
+               info: Dict[int, Tuple[str, str, str]]) -> "NAVStore":
+        # Sort by (code, day); among duplicates the last parsed row comes first and is kept.
+        order = np.lexsort((-np.arange(len(codes)), days, codes))
+        codes, days, navs = codes[order], days[order], navs[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (days[1:] != days[:-1])
+        codes, days, navs = codes[keep], days[keep], navs[keep]
+
+        unique, starts = np.unique(codes, return_index=True)
+        starts = np.append(starts, len(codes)).astype(np.int64)
+        blob, offsets = bytearray(), [0]
+        for code in unique.tolist():
+            for text in info[code]:
+                blob.extend(text.encode("utf-8"))
+                offsets.append(len(blob))
+        return cls(unique, starts, days, navs,
+                   np.frombuffer(bytes(blob), dtype=np.uint8), np.array(offsets, dtype=np.int64))
+
+    def save(self, path: str):
+        """Write the store as an ``.npz`` file, replacing ``path`` atomically."""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, codes=self.codes, starts=self.starts, days=self.days, navs=self.navs,
+                 info_blob=np.frombuffer(self._info_blob, dtype=np.uint8),
+                 info_offsets=np.array(self._info_offsets, dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NAVStore":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["codes"], data["starts"], data["days"], data["navs"],
+                       data["info_blob"], data["info_offsets"])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def scheme(self, code: int) -> Optional[Scheme]:
+        """Name, category and fund house of a scheme, if it has any NAV."""
+        i = self._positions.get(code)
+        if i is None:
+            return None
+        offsets, blob = self._info_offsets, self._info_blob
+        name, category, fund_house = (
+            blob[offsets[3 * i + j]:offsets[3 * i + j + 1]].decode("utf-8") for j in range(3)
+        )
+        return Scheme(code, name, category, fund_house)
+
+    def latest(self, code: int) -> Optional[Tuple[date, float]]:
+        """The most recent ``(date, nav)`` of a scheme."""
+        i = self._positions.get(code)
+        if i is None:
+            return None
+        row = int(self.starts[i + 1]) - 1
+        return _EPOCH + timedelta(days=int(self.days[row])), float(self.navs[row])
+
+    def history(self, code: int, start: Optional[date] = None,
+                end: Optional[date] = None) -> List[Tuple[date, float]]:
+        """``(date, nav)`` of a scheme between ``start`` and ``end`` inclusive, oldest first."""
+        i = self._positions.get(code)
+        if i is None:
+            return []
+        first, last = int(self.starts[i]), int(self.starts[i + 1])
+        days = self.days[first:last]
+        lo = first + (int(np.searchsorted(days, (start - _EPOCH).days)) if start else 0)
+        hi = first + (int(np.searchsorted(days, (end - _EPOCH).days, side="right")) if end else len(days))
+        return [(_EPOCH + timedelta(days=day), nav)
+                for day, nav in zip(self.days[lo:hi].tolist(), self.navs[lo:hi].tolist())]
+
+
+_store: Optional[NAVStore] = None
+
+
+def _set_store(store: Optional[NAVStore]):
+    global _store
+    _store = store
+
+
+def get_nav_store() -> Optional[NAVStore]:
+    """The current NAV store (None if there is none); :func:`watch_nav_store` keeps it current."""
+    return _store
+
+
+def watch_nav_store(path: str = NAV_PATH, interval: float = 1.0) -> FileWatcher:
+    """Load the store in ``path`` now, then reload it in the background
+    whenever the file is replaced, so requests never wait for a load."""
+    watcher = FileWatcher(NAVStore.load, _set_store, path, interval, "NAV store", optional=True)
+    watcher.start()
+    return watcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest AMFI NAV files into the NAV store.")
+    parser.add_argument("paths", nargs="+", help="NAVAll.txt and/or NAV history files, oldest first")
+    parser.add_argument("--output", default=NAV_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = NAVStore.ingest(args.paths)
+    store.save(args.output)
+    size = sum(os.path.getsize(path) for path in args.paths)
+    seconds = time.perf_counter() - start
+    print(f"{len(store)} NAVs of {len(store.codes)} schemes from {size / 2 ** 20:.1f} MiB "
+          f"in {seconds:.1f}s ({size / 2 ** 20 / seconds:.1f} MiB/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
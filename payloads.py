@@ -0,0 +1,95 @@
+"""
+Mutual Fund FAQ Assistant - Precomputed Payloads
+Response bodies built once, with compressed variants, ETags and conditional-request handling.
+"""
+
+import gzip
+import hashlib
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+
+class Payload(NamedTuple):
+    """An immutable response body and its precompressed variants."""
+    body: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+    content_type: str
+    cache_control: str
+
+
+def build_payload(body: bytes, content_type: str = "application/json",
+                  cache_control: str = DEFAULT_CACHE_CONTROL) -> Payload:
+    """Compress ``body`` once and tag it with a content-hash ETag."""
+    return Payload(
+        body=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0),
+        br=brotli.compress(body, quality=11) if brotli else None,
+        # Weak, so the same tag validates every Content-Encoding of the body.
+        etag='W/"%s"' % hashlib.sha256(body).hexdigest()[:32],
+        content_type=content_type,
+        cache_control=cache_control
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(payload: Payload, accept_encoding: str = "",
+              if_none_match: str = "") -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Pick the status, headers and body variant for a request.
+
+    Returns 304 with an empty body when ``If-None-Match`` matches, otherwise
+    the smallest encoding the client accepts (brotli, then gzip, then
+    identity).
+    """
+    headers = [
+        ("ETag", payload.etag),
+        ("Cache-Control", payload.cache_control),
+        ("Vary", "Accept-Encoding")
+    ]
+    if if_none_match and _etag_matches(if_none_match, payload.etag):
+        return 304, headers, b""
+
+    accepted = _accepted_encodings(accept_encoding)
+    headers.append(("Content-Type", payload.content_type))
+    if payload.br is not None and ("br" in accepted or "*" in accepted):
+        headers.append(("Content-Encoding", "br"))
+        return 200, headers, payload.br
+    if "gzip" in accepted or "*" in accepted:
+        headers.append(("Content-Encoding", "gzip"))
+        return 200, headers, payload.gzip
+    return 200, headers, payload.body
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Mutual Fund FAQ Assistant - Request Profiling
+cProfile capture of single requests, sampled profile dumps and their offline aggregation.
+
+    python profiling.py profiles/ [--sort cumulative] [--limit 30]
+"""
+
+import argparse
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import random
+import threading
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+# Only one profiler can be active per process on Python 3.12+, so captures
+# are serialized; sampled captures are skipped rather than wait.
+_profile_lock = threading.Lock()
+
+
+def profile_call(fn: Callable, *args, wait: float = 5.0, **kwargs) -> Tuple[object, Optional[cProfile.Profile]]:
+    """Run ``fn`` under cProfile, returning its result and the profile.
+
+    Waits up to ``wait`` seconds (0: not at all) for a running capture to
+    finish; the profile is None when it did not, and the call ran
+    unprofiled.
+    """
+    if not _profile_lock.acquire(timeout=wait if wait > 0 else -1, blocking=wait > 0):
+        return fn(*args, **kwargs), None
+    try:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args, **kwargs)
+        return result, profiler
+    finally:
+        _profile_lock.release()
+
+
+def summarize(stats_source, sort: str = "cumulative", limit: int = 25) -> str:
+    """Text table of the top ``limit`` functions of a profile (or .prof files)."""
+    out = io.StringIO()
+    sources = stats_source if isinstance(stats_source, (list, tuple)) else [stats_source]
+    stats = pstats.Stats(*sources, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class ProfileSampler:
+    """Profiles roughly one call in ``1 / rate`` and writes it to ``directory``.
+
+    Dumps are regular ``.prof`` files named ``<unix time>-<pid>-<n>.prof``
+    so several workers can share one directory.
+    """
+
+    def __init__(self, rate: float, directory: str):
+        self.rate = rate
+        self.directory = directory
+        # next() on a count is atomic, so concurrent dumps get distinct numbers.
+        self._numbers = itertools.count(1)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Call ``fn``, profiling and dumping this call if it is sampled."""
+        if self.rate <= 0 or random.random() >= self.rate:
+            return fn(*args, **kwargs)
+        result, profiler = profile_call(fn, *args, wait=0, **kwargs)
+        if profiler is not None:
+            number = next(self._numbers)
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(
+                self.directory, f"{int(time.time())}-{os.getpid()}-{number}.prof"
+            ))
+        return result
+
+
+def _profile_files(paths: Sequence[str]):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".prof"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate sampled request profiles.")
+    parser.add_argument("paths", nargs="+", help=".prof files or directories of them")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key, e.g. tottime")
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+
+    files = list(_profile_files(args.paths))
+    if not files:
+        parser.error("no .prof files found")
+    print(f"{len(files)} profiles")
+    print(summarize(files, args.sort, args.limit))
+
+
+if __name__ == "__main__":
+    main()
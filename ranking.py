@@ -0,0 +1,155 @@
+"""
+Mutual Fund FAQ Assistant - Ranked Retrieval
+BM25 ranking over FAQ question, keyword and answer text with top-k results.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from faq_index import FAQIndex, FAQRecord
+from tokenizer import Vocabulary, tokenize
+
+MAX_TOP_K = 50
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i if in is it its me my of on or so
+that the their there this to was what when where which who why will with you your
+""".split())
+
+
+def _stem(token: str) -> str:
+    """Strip the few inflections that matter for FAQ text (funds, redeemed, investing)."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3 and not token.endswith("ss"):
+            return token[:-len(suffix)]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize, drop stopwords and stem."""
+    return [_stem(token) for token in tokenize(text) if token not in STOPWORDS]
+
+
+# Term ids shared by every ranker, and each FAQ's analyzed (term ids, term
+# counts, length) from the latest build; both only change under the lock.
+_TERMS = Vocabulary()
+_analyzed: Dict[FAQRecord, Tuple[np.ndarray, np.ndarray, int]] = {}
+_build_lock = threading.Lock()
+
+
+def _analyze_faq(faq: FAQRecord) -> Tuple[np.ndarray, np.ndarray, int]:
+    terms = analyze(faq.question) * 2 + analyze(" ".join(faq.keywords)) + analyze(faq.answer)
+    term_ids, counts = np.unique(
+        np.fromiter((_TERMS.intern(term) for term in terms), dtype=np.int32, count=len(terms)),
+        return_counts=True
+    )
+    return term_ids, counts.astype(np.float32), len(terms)
+
+
+class BM25Ranker:
+    """BM25 over a term x FAQ matrix stored as CSR (one row of postings per term).
+
+    Weights are fully precomputed at build time, so a query is a gather of
+    its terms' rows, one ``bincount`` and a partition for the top-k. The
+    question counts twice and the keywords once on top of the answer text.
+    Each FAQ's analyzed terms are remembered, so the ranker for an edited
+    corpus only analyzes the FAQs that changed.
+    """
+
+    DENSE_ROW_FRACTION = 0.25
+
+    def __init__(self, index: FAQIndex, k1: float = 1.2, b: float = 0.75):
+        global _analyzed
+        self._index = index
+        n_docs = len(index)
+        with _build_lock:
+            previous = _analyzed
+            analyzed = {faq: previous.get(faq) or _analyze_faq(faq) for faq in index}
+            _analyzed = analyzed
+            n_terms = len(_TERMS)
+        entries = [analyzed[faq] for faq in index]
+
+        doc_lengths = np.fromiter((length for _, _, length in entries), dtype=np.float32, count=n_docs)
+        row_sizes = np.fromiter((len(terms) for terms, _, _ in entries), dtype=np.int64, count=n_docs)
+        if entries:
+            term_ids = np.concatenate([terms for terms, _, _ in entries])
+            tf = np.concatenate([counts for _, counts, _ in entries])
+        else:
+            term_ids = np.zeros(0, dtype=np.int32)
+            tf = np.zeros(0, dtype=np.float32)
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int32), row_sizes)
+
+        avg_length = float(doc_lengths.mean()) if n_docs else 0.0
+        norm = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(n_docs, k1)
+
+        # Group the (doc, term) pairs by term; the stable sort keeps docs ascending.
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, docs, tf = term_ids[order], doc_ids[order], tf[order]
+        doc_freq = np.bincount(term_ids, minlength=n_terms)
+        idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(doc_freq)
+
+        self._n_terms = n_terms
+        self._indptr = indptr
+        self._docs = docs
+        self._weights = (idf[term_ids] * tf * (k1 + 1) / (tf + norm[docs])).astype(np.float32)
+        # Rows of terms found in a large share of FAQs are also kept dense (at
+        # most twice their CSR size) and summed with one contiguous add.
+        self._dense_rows: Dict[int, np.ndarray] = {}
+        for term_id in np.flatnonzero(doc_freq > n_docs * self.DENSE_ROW_FRACTION).tolist():
+            row = np.zeros(n_docs, dtype=np.float64)
+            start, end = indptr[term_id], indptr[term_id + 1]
+            row[docs[start:end]] = self._weights[start:end]
+            self._dense_rows[term_id] = row
+
+    def _scores(self, term_ids) -> np.ndarray:
+        sparse = [t for t in term_ids if t not in self._dense_rows]
+        if sparse:
+            indptr = self._indptr
+            docs = np.concatenate([self._docs[indptr[t]:indptr[t + 1]] for t in sparse])
+            weights = np.concatenate([self._weights[indptr[t]:indptr[t + 1]] for t in sparse])
+            scores = np.bincount(docs, weights=weights, minlength=len(self._index))
+        else:
+            scores = np.zeros(len(self._index), dtype=np.float64)
+        for term_id in term_ids:
+            dense_row = self._dense_rows.get(term_id)
+            if dense_row is not None:
+                scores += dense_row
+        return scores
+
+    def rank(self, query: str, k: int = 5) -> List[Tuple[FAQRecord, float]]:
+        """Return up to ``k`` FAQs with a positive score, best first."""
+        term_ids = {term_id for term_id in _TERMS.encode(analyze(query)) if 0 <= term_id < self._n_terms}
+        if not term_ids or k <= 0:
+            return []
+
+        scores = self._scores(term_ids)
+        candidates = np.flatnonzero(scores > 0)
+        scores = scores[candidates]
+
+        if len(candidates) > k:
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores > threshold
+            # Candidates are in corpus order, so ties at the cut keep the earliest FAQs.
+            keep[np.flatnonzero(scores == threshold)[:k - int(keep.sum())]] = True
+            candidates, scores = candidates[keep], scores[keep]
+        # Highest score first; ties keep corpus order like the keyword matcher.
+        order = np.lexsort((candidates, -scores))
+        records = self._index.records
+        return [(records[doc], float(score))
+                for doc, score in zip(candidates[order].tolist(), scores[order].tolist())]
+
+
+@lru_cache(maxsize=2)
+def get_ranker(index: FAQIndex) -> BM25Ranker:
+    """Return the (cached) BM25 ranker for an index."""
+    return BM25Ranker(index)
+
+
+def rank(index: FAQIndex, query: str, k: int = 5) -> List[Tuple[FAQRecord, float]]:
+    """Top-``k`` FAQs for ``query`` by BM25 score."""
+    return get_ranker(index).rank(query, k)
@@ -0,0 +1,201 @@
+"""
+Mutual Fund FAQ Assistant - Result Cache
+Size-bounded caches of ready-to-send search responses, per process or shared by a host's workers.
+"""
+
+import logging
+import marshal
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Thread-safe LRU cache keyed on normalized queries.
+
+    Entries belong to one corpus version; the first lookup or store with a
+    different version clears the cache so stale answers are never served.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version: str, key: Hashable):
+        """Return the cached value for ``key``, or None on a miss."""
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version: str, key: Hashable, value):
+        """Store ``value``, evicting the least recently used entries past ``maxsize``."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+class SharedResultCache:
+    """Result cache in an SQLite file that every worker process on a host shares.
+
+    Same interface as :class:`ResultCache`, so a response computed by one
+    gunicorn worker is a hit in all of them and is stored once. The file
+    runs in WAL mode, so lookups never wait for a writer. Entries expire
+    ``ttl`` seconds after they are stored; every ``_SWEEP_EVERY`` stores
+    (and whenever the corpus version changes) expired entries and those of
+    other versions are deleted, then the oldest stored ones beyond
+    ``maxsize``. Hits stay read-only, which makes eviction first-in
+    first-out rather than LRU. Values must be marshal-able (bytes, numbers,
+    None and tuples of them); keys are stored by ``repr``. An SQLite error
+    is logged and treated as a miss, never failing the request.
+
+    Counters are per process.
+    """
+
+    _SWEEP_EVERY = 64
+
+    def __init__(self, path: str, maxsize: int = 4096, ttl: float = 3600.0):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._version: Optional[str] = None
+        self._stores = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, opened again after a fork.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "version TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires REAL NOT NULL, "
+                "PRIMARY KEY (version, key))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires)")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def get(self, version: str, key: Hashable):
+        """Return the cached value for ``key``, or None on a miss."""
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM results WHERE version = ? AND key = ? AND expires > ?",
+                (version, repr(key), time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Shared result cache lookup failed", exc_info=True)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return marshal.loads(row[0])
+
+    def put(self, version: str, key: Hashable, value):
+        """Store ``value``, sweeping expired, stale and excess entries now and then."""
+        if self.maxsize <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._stores += 1
+            sweep = version != self._version or self._stores % self._SWEEP_EVERY == 0
+            self._version = version
+        try:
+            connection = self._connection()
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                               (version, repr(key), marshal.dumps(value), now + self.ttl))
+            if sweep:
+                self._sweep(connection, version, now)
+        except sqlite3.Error:
+            logger.warning("Shared result cache store failed", exc_info=True)
+
+    def _sweep(self, connection: sqlite3.Connection, version: str, now: float):
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM results WHERE version != ?", (version,))
+            removed = connection.execute("DELETE FROM results WHERE expires <= ?", (now,)).rowcount
+            excess = connection.execute("SELECT count(*) FROM results").fetchone()[0] - self.maxsize
+            if excess > 0:
+                removed += connection.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY expires LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        with self._lock:
+            self.evictions += removed
+
+    def clear(self):
+        """Drop every entry, for all processes; counters are kept."""
+        self._connection().execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT count(*) FROM results").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache; ``size`` counts the entries of every process."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,275 @@
+"""
+Mutual Fund FAQ Assistant - Scheme Resolver
+Resolves scheme names mentioned in free text to AMFI scheme codes.
+"""
+
+import csv
+import hashlib
+import io
+import os
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+import numpy as np
+
+from corpus import FileWatcher
+from fuzzy import DEFAULT_MAX_EDIT_DISTANCE, allowed_distance, edit_distance
+from tokenizer import normalize
+
+SCHEMES_PATH = os.environ.get(
+    "MF_FAQ_SCHEMES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "schemes.csv")
+)
+
+MAX_SCHEMES = 5
+# Share of a scheme name's weight the query has to match.
+MIN_COVERAGE = 0.6
+
+# Words of nearly every scheme name that identify nothing.
+_NOISE = frozenset(("fund", "funds", "plan", "option", "options", "scheme", "mutual", "mf", "the", "of", "and"))
+_ALIASES = {"dividend": "idcw", "div": "idcw", "gr": "growth", "dir": "direct", "reg": "regular"}
+# Strength of a word matched within a few edits or by prefix, relative to an
+# exact match. Prefixes ("nav" -> "Navi") never name a fund house.
+_MISSPELLED = 0.8
+_PREFIX = 0.7
+_MIN_PREFIX = 3
+_MAX_PREFIX_TERMS = 8
+_MAX = "\U0010ffff"
+# Past this many runs of consecutive candidates, they are scored by binary search instead.
+_MAX_RUNS = 8
+
+
+class SchemeMatch(NamedTuple):
+    """A scheme mentioned in a query and how much of its name was matched."""
+    code: int
+    name: str
+    amc: str
+    score: float
+
+
+def _words(text: str) -> List[str]:
+    words = []
+    for word in normalize(text).split():
+        word = _ALIASES.get(word, word)
+        if word not in _NOISE:
+            words.append(word)
+    return words
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SchemeResolver:
+    """Finds the schemes whose names a free-text query mentions.
+
+    Scheme and AMC names are split into normalized words (plan and option
+    spellings such as "Dividend" / "IDCW" unified, filler like "Fund" or
+    "Plan" dropped), each weighted by its IDF. A query word matches a name
+    word exactly, as a prefix ("flexi cap dir") or, if it is long enough,
+    within the edit distance :func:`fuzzy.allowed_distance` allows, with
+    candidates found through a trigram index of the name words. A scheme
+    qualifies when the query names its fund house (a word of the AMC name
+    or the first word of the scheme name) and matches at least
+    ``MIN_COVERAGE`` of its name weight, so "what is a flexi cap fund"
+    resolves to nothing while "parag parikh flexicap dir gr" does.
+
+    Every name word and fund house has a sorted posting list of the schemes
+    containing it. Only the schemes of the fund houses the query names are
+    scored, from the part of each query word's posting list that falls in
+    their range, so the cost follows the size of those fund houses rather
+    than of the whole master.
+    """
+
+    def __init__(self, schemes: Iterable[dict], version: str = ""):
+        self.version = version
+        self._codes: List[int] = []
+        self._names: List[str] = []
+        self._amcs: List[str] = []
+        self._ids: Dict[str, int] = {}
+        name_terms: List[int] = []
+        starts = [0]
+        brands: Dict[int, List[int]] = {}
+        # Schemes are numbered by fund house, so each one's schemes are a
+        # contiguous run of every posting list; _file_order keeps ties in file order.
+        ordered = sorted(enumerate(schemes), key=lambda item: item[1].get("amc", ""))
+        self._file_order = np.array([row for row, _ in ordered], dtype=np.int64)
+        for position, (_, scheme) in enumerate(ordered):
+            name, amc = scheme["name"], scheme.get("amc", "")
+            self._codes.append(int(scheme["code"]))
+            self._names.append(name)
+            self._amcs.append(amc)
+            words = _words(name)
+            name_terms.extend(sorted({self._ids.setdefault(word, len(self._ids)) for word in words}))
+            starts.append(len(name_terms))
+            for word in set(_words(amc) + words[:1]):
+                brands.setdefault(self._ids.setdefault(word, len(self._ids)), []).append(position)
+
+        n_schemes = len(self._codes)
+        name_terms = np.array(name_terms, dtype=np.int32)
+        rows = np.repeat(np.arange(n_schemes, dtype=np.int32), np.diff(starts))
+        doc_freq = np.bincount(name_terms, minlength=len(self._ids))
+        # The schemes with word i in their name are _postings[_bounds[i]:_bounds[i + 1]].
+        self._postings = rows[np.argsort(name_terms, kind="stable")]
+        self._bounds = np.concatenate(([0], np.cumsum(doc_freq))).tolist()
+        # The words of one fund house's name share a posting list.
+        shared: Dict[tuple, np.ndarray] = {}
+        self._brands = {
+            term: shared.setdefault(tuple(positions), np.array(positions, dtype=np.int32))
+            for term, positions in brands.items()
+        }
+        self._idf = (np.log((1 + n_schemes) / (1 + doc_freq)) + 1).tolist()
+        self._name_weights = np.bincount(rows, weights=np.take(self._idf, name_terms), minlength=n_schemes)
+
+        self._sorted_terms = sorted(self._ids)
+        self._trigram_terms: Dict[str, List[str]] = {}
+        for term in self._sorted_terms:
+            for trigram in _trigrams(term):
+                self._trigram_terms.setdefault(trigram, []).append(term)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _inexact(self, word: str) -> Dict[int, float]:
+        """Name words ``word`` abbreviates or misspells."""
+        matches: Dict[int, float] = {}
+        if len(word) >= _MIN_PREFIX:
+            lo = bisect_left(self._sorted_terms, word)
+            hi = bisect_left(self._sorted_terms, word + _MAX, lo)
+            if hi - lo <= _MAX_PREFIX_TERMS:
+                for term in self._sorted_terms[lo:hi]:
+                    matches[self._ids[term]] = _PREFIX
+        distance = allowed_distance(len(word), DEFAULT_MAX_EDIT_DISTANCE)
+        if distance:
+            trigrams = _trigrams(word)
+            # Each edit changes at most three trigrams.
+            needed = len(trigrams) - 3 * distance
+            shared: Dict[str, int] = {}
+            for trigram in trigrams:
+                for term in self._trigram_terms.get(trigram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term, count in shared.items():
+                if count >= needed and edit_distance(word, term, distance) <= distance:
+                    matches[self._ids[term]] = _MISSPELLED
+        return matches
+
+    def _query_terms(self, query: str) -> Dict[int, float]:
+        """Name word id -> match strength for the words of ``query``."""
+        words = _words(query)
+        ids = self._ids
+        terms: Dict[int, float] = {}
+        for i, word in enumerate(words):
+            found: Dict[int, float] = {}
+            if word in ids:
+                found[ids[word]] = 1.0
+            else:
+                # "flexicap" for "Flexi Cap"
+                for split in range(_MIN_PREFIX, len(word) - _MIN_PREFIX + 1):
+                    if word[:split] in ids and word[split:] in ids:
+                        found[ids[word[:split]]] = found[ids[word[split:]]] = 1.0
+                        break
+                else:
+                    found = self._inexact(word)
+            # "small cap" for "Smallcap"
+            if i + 1 < len(words) and word + words[i + 1] in ids:
+                found[ids[word + words[i + 1]]] = 1.0
+            for term, strength in found.items():
+                terms[term] = max(terms.get(term, 0.0), strength)
+        return terms
+
+    def resolve(self, query: str, limit: int = MAX_SCHEMES) -> List[SchemeMatch]:
+        """Return up to ``limit`` schemes mentioned in ``query``, best first."""
+        terms = self._query_terms(query)
+        brands = list({
+            id(self._brands[term]): self._brands[term] for term, strength in terms.items()
+            if strength >= _MISSPELLED and term in self._brands
+        }.values())
+        if not brands or limit <= 0:
+            return []
+
+        # Only schemes of a named fund house can qualify, so only they are scored.
+        candidates = brands[0]
+        if len(brands) > 1:
+            # np.unique hashes; sorting the concatenated runs is far faster.
+            candidates = np.sort(np.concatenate(brands))
+            candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+        matched = np.zeros(len(candidates))
+        bounds, idf = self._bounds, self._idf
+        breaks = np.flatnonzero(np.diff(candidates) != 1) + 1
+        if len(breaks) < _MAX_RUNS:
+            # Usually a run of consecutive schemes per fund house: each query
+            # word adds its weight to the slice of its posting list in each run.
+            # The run edges are kept int32, or searchsorted would cast the
+            # whole posting list to compare with them.
+            offsets = [0, *breaks.tolist(), len(candidates)]
+            edges = np.empty(2 * len(offsets) - 2, dtype=candidates.dtype)
+            edges[0::2] = candidates[offsets[:-1]]
+            edges[1::2] = candidates[np.subtract(offsets[1:], 1)] + 1
+            shifts = (edges[0::2] - offsets[:-1]).tolist()
+            for term, strength in terms.items():
+                postings = self._postings[bounds[term]:bounds[term + 1]]
+                cuts = np.searchsorted(postings, edges).tolist()
+                for run, shift in enumerate(shifts):
+                    matched[postings[cuts[2 * run]:cuts[2 * run + 1]] - shift] += strength * idf[term]
+        else:
+            lo, hi = candidates[0], candidates[-1] + 1
+            for term, strength in terms.items():
+                postings = self._postings[bounds[term]:bounds[term + 1]]
+                postings = postings[np.searchsorted(postings, lo):np.searchsorted(postings, hi)]
+                found = np.searchsorted(candidates, postings)
+                matched[found[candidates[found] == postings]] += strength * idf[term]
+        name_weights = self._name_weights[candidates]
+        qualified = (matched > 0) & (matched >= MIN_COVERAGE * name_weights)
+        candidates, matched = candidates[qualified], matched[qualified]
+        coverage = matched / name_weights[qualified]
+
+        # Most of the query matched first, then the closest name; ties keep file order.
+        order = np.lexsort((self._file_order[candidates], -coverage, -matched))[:limit]
+        return [
+            SchemeMatch(self._codes[i], self._names[i], self._amcs[i], round(float(coverage[j]), 4))
+            for i, j in zip(candidates[order].tolist(), order.tolist())
+        ]
+
+
+def load_scheme_master(path: str) -> SchemeResolver:
+    """Build a resolver from AMFI's scheme master CSV.
+
+    Uses the ``Code``, ``AMC`` and ``Scheme NAV Name`` columns (falling
+    back to ``Scheme Name``), so each plan and option variant is its own
+    scheme. Raises ValueError if the file has no such columns.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig", "replace")))
+    reader.fieldnames = [field.strip().lower() for field in reader.fieldnames or ()]
+    if "code" not in reader.fieldnames or not {"scheme nav name", "scheme name"} & set(reader.fieldnames):
+        raise ValueError(f"{path} is not a scheme master: no Code and Scheme NAV Name columns")
+    schemes = []
+    for row in reader:
+        code = (row.get("code") or "").strip()
+        name = (row.get("scheme nav name") or row.get("scheme name") or "").strip()
+        if code.isdigit() and name:
+            schemes.append({"code": int(code), "name": name, "amc": (row.get("amc") or "").strip()})
+    return SchemeResolver(schemes, hashlib.sha256(data).hexdigest()[:16])
+
+
+_resolver: Optional[SchemeResolver] = None
+
+
+def _set_resolver(resolver: Optional[SchemeResolver]):
+    global _resolver
+    _resolver = resolver
+
+
+def get_scheme_resolver() -> Optional[SchemeResolver]:
+    """The resolver for the current scheme master (None if there is none);
+    :func:`watch_scheme_master` keeps it current."""
+    return _resolver
+
+
+def watch_scheme_master(path: str = SCHEMES_PATH, interval: float = 1.0) -> FileWatcher:
+    """Load the master in ``path`` now, then rebuild the resolver in the
+    background whenever the file changes, so requests never wait for a build."""
+    watcher = FileWatcher(load_scheme_master, _set_resolver, path, interval, "scheme master", optional=True)
+    watcher.start()
+    return watcher
@@ -0,0 +1,237 @@
+"""
+Mutual Fund FAQ Assistant - Semantic Retrieval
+Offline dense retrieval over hashed word and character n-gram embeddings.
+"""
+
+import os
+import threading
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from faq_index import FAQIndex, FAQRecord
+from ranking import analyze
+from tokenizer import tokenize
+
+DIMENSIONS = 256
+MIN_SIMILARITY = 0.1
+# Stricter bar for answering a query that no keyword matched; unrelated
+# questions typically reach 0.1-0.2 through shared character n-grams.
+FALLBACK_MIN_SIMILARITY = 0.2
+
+# Corpora at least this large get a coarse (IVF) layer: only the FAQs of
+# the IVF_PROBES clusters closest to the query are scored.
+IVF_MIN_SIZE = int(os.environ.get("MF_FAQ_SEMANTIC_IVF_MIN_SIZE", 200_000))
+IVF_PROBES = int(os.environ.get("MF_FAQ_SEMANTIC_IVF_PROBES", 16))
+
+_HASH_BITS = 20
+_HASH_MASK = (1 << _HASH_BITS) - 1
+# Non-zeros per hashed feature in the random projection.
+_PROJECTIONS = 2
+_SEED = 3
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & _HASH_MASK
+
+
+@lru_cache(maxsize=1)
+def _projection() -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse random projection of the hashed feature space: ``(dims, signs)`` per feature."""
+    rng = np.random.default_rng(_SEED)
+    dims = rng.integers(0, DIMENSIONS, size=(1 << _HASH_BITS, _PROJECTIONS), dtype=np.int16)
+    signs = rng.choice(np.array([-1, 1], dtype=np.int8), size=(1 << _HASH_BITS, _PROJECTIONS))
+    return dims, signs
+
+
+# Hashed features of every word seen while indexing, and each FAQ's
+# (feature hashes, counts) from the latest build; both only change under
+# the lock.
+_words: Dict[str, Optional[Tuple[int, Tuple[int, ...]]]] = {}
+_embedded: Dict[FAQRecord, Tuple[np.ndarray, np.ndarray]] = {}
+_build_lock = threading.Lock()
+
+
+def _word(token: str, intern: bool) -> Optional[Tuple[int, Tuple[int, ...]]]:
+    """Hashes of a word's stem and of the stem's character 3/4-grams; None for stopwords."""
+    if token in _words:
+        return _words[token]
+    stems = analyze(token)
+    entry = None
+    if stems:
+        padded = f"<{stems[0]}>"
+        entry = _hash(stems[0]), tuple(
+            _hash(padded[i:i + n]) for n in (3, 4) for i in range(len(padded) - n + 1)
+        )
+    if intern:
+        _words[token] = entry
+    return entry
+
+
+def _features(text: str, char_ngrams: bool, intern: bool) -> List[int]:
+    """Hashed stemmed words and word bigrams, plus character n-grams if ``char_ngrams``."""
+    known = _words
+    words = [entry for entry in (known[token] if token in known else _word(token, intern)
+                                 for token in tokenize(text)) if entry]
+    stems = [stem for stem, _ in words]
+    features = stems + [((a * 0x9E3779B1) ^ b) & _HASH_MASK for a, b in zip(stems, stems[1:])]
+    if char_ngrams:
+        for _, ngrams in words:
+            features.extend(ngrams)
+    return features
+
+
+def _counted(features: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    ids, counts = np.unique(np.array(features, dtype=np.int64), return_counts=True)
+    return ids, counts.astype(np.float32)
+
+
+def _embed_faq(faq: FAQRecord) -> Tuple[np.ndarray, np.ndarray]:
+    return _counted(_features(faq.question, True, True) * 2
+                    + _features(" ".join(faq.keywords), True, True)
+                    + _features(faq.answer, False, True))
+
+
+class SemanticIndex:
+    """Dense retrieval for paraphrases that share no keyword with an FAQ.
+
+    Words, word bigrams and character 3/4-grams of each FAQ (question
+    twice, keywords, and the answer's words) are hashed into 2**20
+    features, weighted by sublinear TF-IDF and reduced to ``DIMENSIONS``
+    by a fixed sparse random projection. The unit-length rows form one
+    contiguous float32 matrix, so a query is one matrix-vector product and
+    an ``argpartition``. Character n-grams let "fees" meet "fee" and
+    "yearly" meet "year"; nothing needs a model download or a GPU.
+    """
+
+    def __init__(self, index: FAQIndex):
+        global _embedded
+        self._index = index
+        n_docs = len(index)
+        with _build_lock:
+            previous = _embedded
+            embedded = {faq: previous.get(faq) or _embed_faq(faq) for faq in index}
+            _embedded = embedded
+        entries = [embedded[faq] for faq in index]
+
+        sizes = np.fromiter((len(ids) for ids, _ in entries), dtype=np.int64, count=n_docs)
+        if entries:
+            ids = np.concatenate([ids for ids, _ in entries])
+            tf = np.concatenate([counts for _, counts in entries])
+        else:
+            ids = np.zeros(0, dtype=np.int64)
+            tf = np.zeros(0, dtype=np.float32)
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), sizes)
+
+        doc_freq = np.bincount(ids, minlength=1 << _HASH_BITS)
+        self._idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+        # Features no FAQ has cannot raise a similarity; leave them out of queries.
+        self._idf[doc_freq == 0] = 0
+        weights = (1 + np.log(tf)) * self._idf[ids]
+
+        dims, signs = _projection()
+        matrix = np.zeros((n_docs, DIMENSIONS), dtype=np.float32)
+        for j in range(_PROJECTIONS):
+            np.add.at(matrix, (rows, dims[ids, j]), weights * signs[ids, j])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1)
+
+        self._ivf = n_docs >= IVF_MIN_SIZE
+        if self._ivf:
+            self._build_ivf(matrix)
+        else:
+            self._matrix = np.ascontiguousarray(matrix)
+
+    def _build_ivf(self, matrix: np.ndarray):
+        """Cluster the rows with spherical k-means and store each cluster contiguously."""
+        n_docs = len(matrix)
+        n_clusters = max(1, int(np.sqrt(n_docs)))
+        rng = np.random.default_rng(_SEED)
+        sample = matrix[rng.choice(n_docs, size=min(n_docs, 64 * n_clusters), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)]
+        for _ in range(8):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid.
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+
+        assignment = np.concatenate([
+            np.argmax(matrix[start:start + 65536] @ centroids.T, axis=1)
+            for start in range(0, n_docs, 65536)
+        ])
+        self._order = np.argsort(assignment, kind="stable")
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=n_clusters))))
+        self._centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self._matrix = np.ascontiguousarray(matrix[self._order])
+
+    def embed(self, text: str) -> np.ndarray:
+        """Unit-length embedding of a query (all zeros if nothing in it is indexed)."""
+        ids, tf = _counted(_features(text, True, False))
+        weights = (1 + np.log(tf)) * self._idf[ids]
+        dims, signs = _projection()
+        vector = np.zeros(DIMENSIONS, dtype=np.float32)
+        for j in range(_PROJECTIONS):
+            np.add.at(vector, dims[ids, j], weights * signs[ids, j])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _similarities(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(corpus positions, cosine similarities)`` of the FAQs scored for ``query``."""
+        if not self._ivf:
+            return np.arange(len(self._matrix)), self._matrix @ query
+        closest = self._centroids @ query
+        probes = min(IVF_PROBES, len(closest))
+        clusters = np.argpartition(-closest, probes - 1)[:probes]
+        rows = np.concatenate([np.arange(self._offsets[c], self._offsets[c + 1]) for c in clusters])
+        return self._order[rows], self._matrix[rows] @ query
+
+    def rank(self, query: str, k: int = 5) -> List[Tuple[FAQRecord, float]]:
+        """Return up to ``k`` FAQs with a cosine similarity of at least ``MIN_SIMILARITY``, best first."""
+        vector = self.embed(query)
+        if k <= 0 or not vector.any() or not len(self._matrix):
+            return []
+
+        candidates, scores = self._similarities(vector)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        keep = scores >= MIN_SIMILARITY
+        candidates, scores = candidates[keep], scores[keep]
+        # Highest similarity first; ties keep corpus order.
+        order = np.lexsort((candidates, -scores))
+        records = self._index.records
+        return [(records[doc], float(score))
+                for doc, score in zip(candidates[order].tolist(), scores[order].tolist())]
+
+
+@lru_cache(maxsize=2)
+def get_semantic_index(index: FAQIndex) -> SemanticIndex:
+    """Return the (cached) semantic index for an index."""
+    return SemanticIndex(index)
+
+
+def semantic_rank(index: FAQIndex, query: str, k: int = 5) -> List[Tuple[FAQRecord, float]]:
+    """Top-``k`` FAQs for ``query`` by embedding similarity."""
+    return get_semantic_index(index).rank(query, k)
+
+
+def semantic_match(index: FAQIndex, query: str) -> Optional[FAQRecord]:
+    """The most similar FAQ, for use when keyword matching finds nothing."""
+    results = semantic_rank(index, query, 1)
+    return results[0][0] if results and results[0][1] >= FALLBACK_MIN_SIMILARITY else None
+
+
+def match_with_fallback(index: FAQIndex, query: str) -> Tuple[Optional[FAQRecord], Optional[int]]:
+    """The FAQ every front end answers ``query`` with, and its keyword score.
+
+    Keyword matching (typo-tolerant) decides when it finds anything;
+    otherwise the most similar FAQ is returned, with a score of None.
+    """
+    faq, score = index.match(query)
+    if faq is not None:
+        return faq, score
+    return semantic_match(index, query), None
@@ -0,0 +1,78 @@
+"""
+Mutual Fund FAQ Assistant - Streamlit Support
+Process-wide index and answer-card caches for the Streamlit app.
+
+Streamlit re-executes its script on every interaction, so anything defined
+there is defined again each time, and st.cache_* decorators hash the
+function's source on every rerun to find its cache. Defined here, these are
+built once per process and shared by every session.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from corpus import CORPUS_PATH, load_corpus
+from faq_index import POPULAR_TOPICS, FAQIndex, current_index, swap_index
+
+_load_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2)
+def _load_index(corpus_signature) -> FAQIndex:
+    """The index for one version of the corpus file.
+
+    Edits to the file are picked up on the next rerun; only the changed
+    FAQs are re-indexed.
+    """
+    with _load_lock:
+        try:
+            index = current_index().updated(load_corpus(CORPUS_PATH))
+        except (OSError, ValueError):
+            return current_index()
+        swap_index(index)
+        return index
+
+
+def get_index() -> FAQIndex:
+    try:
+        stat = os.stat(CORPUS_PATH)
+    except OSError:
+        return current_index()
+    return _load_index((stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=2)
+def topic_faq_ids(index: FAQIndex) -> Tuple[Optional[int], ...]:
+    """FAQ id answering each popular topic, so chip clicks skip the search."""
+    return tuple(
+        faq.id if faq else None
+        for faq in (index.search(query) for _, query in POPULAR_TOPICS)
+    )
+
+
+@lru_cache(maxsize=2)
+def _answer_cards(index: FAQIndex) -> Dict[int, str]:
+    return {}
+
+
+def answer_card_html(index: FAQIndex, faq_id: int) -> str:
+    """Rendered answer card of one FAQ, kept with the index it came from."""
+    cards = _answer_cards(index)
+    card = cards.get(faq_id)
+    if card is None:
+        result = index.get(faq_id)
+        card = cards[faq_id] = f"""
+        <div class="answer-card">
+            <div class="answer-question">{result.question}</div>
+            <div class="answer-content">{result.answer}</div>
+            <div class="source-section">
+                <span class="source-label">Source: </span>
+                <a href="{result.source}" target="_blank" style="color: #2563eb; text-decoration: none; font-weight: 500;">
+                    {result.source_name} ↗
+                </a>
+            </div>
+        </div>
+        """
+    return card
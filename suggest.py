@@ -0,0 +1,226 @@
+"""
+Mutual Fund FAQ Assistant - Autocomplete
+Prefix suggestions over FAQ questions and keywords from a sorted array.
+"""
+
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import heappop, heappush
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from faq_index import POPULAR_TOPICS, FAQIndex, FAQRecord, normalize
+
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+# Sorts after every character, so prefix + _MAX bounds the prefix's range.
+_MAX = "\U0010ffff"
+
+_TOPICS = frozenset(normalize(query) for _, query in POPULAR_TOPICS)
+
+# The suggester built last and its index, patched for the next corpus version.
+_latest: Optional[Tuple[FAQIndex, "Suggester"]] = None
+_build_lock = threading.Lock()
+
+
+def _weight(key: str, count: int) -> int:
+    return ((key in _TOPICS) << 40) | (min(count, 0xFFFFF) << 20) | (0xFFFFF - min(len(key), 0xFFFFF))
+
+
+class Suggestion(NamedTuple):
+    """A completion: the text to show and, for questions, the FAQ it opens."""
+    text: str
+    faq_id: Optional[int]
+
+
+class Suggester:
+    """Completes a normalized prefix to FAQ questions and keywords.
+
+    Every completion is held in one array sorted by normalized text, so
+    the completions of a prefix are a contiguous range found with two
+    bisections. Each has a precomputed weight: popular-topic queries come
+    first, then keywords by how many FAQs share them, then shorter
+    completions before longer ones. A sparse table of range maxima picks
+    the ``limit`` heaviest of any range in O(limit log limit), however
+    many completions share a short prefix.
+
+    :meth:`updated` patches a copy for a new corpus version, touching only
+    the completions of FAQs that were added, changed or removed.
+    """
+
+    # Past this share of changed FAQs, building afresh beats patching.
+    MAX_PATCHED_FRACTION = 1 / 32
+
+    def __init__(self, index: FAQIndex):
+        # keyword -> number of FAQs sharing it
+        self._shared: Dict[str, int] = {}
+        # normalized question -> the FAQs asking it, in corpus order
+        self._questions: Dict[str, Tuple[FAQRecord, ...]] = {}
+        for faq in index:
+            self._add(faq)
+        self._keys = sorted(self._shared.keys() | self._questions.keys())
+        self._entries = [self._entry(key) for key in self._keys]
+        self._weights = [_weight(key, entry[2]) for key, entry in zip(self._keys, self._entries)]
+        self._build_table()
+
+    def _add(self, faq: FAQRecord) -> List[str]:
+        shared = self._shared
+        keys = [keyword for keyword in set(faq.keywords) if keyword]
+        for keyword in keys:
+            shared[keyword] = shared.get(keyword, 0) + 1
+        key = normalize(faq.question)
+        if key:
+            self._questions[key] = self._questions.get(key, ()) + (faq,)
+            keys.append(key)
+        return keys
+
+    def _remove(self, faq: FAQRecord) -> List[str]:
+        shared = self._shared
+        keys = [keyword for keyword in set(faq.keywords) if keyword]
+        for keyword in keys:
+            if shared[keyword] > 1:
+                shared[keyword] -= 1
+            else:
+                del shared[keyword]
+        key = normalize(faq.question)
+        if key:
+            owners = tuple(owner for owner in self._questions[key] if owner is not faq)
+            if owners:
+                self._questions[key] = owners
+            else:
+                del self._questions[key]
+            keys.append(key)
+        return keys
+
+    def _entry(self, key: str) -> Tuple[str, Optional[int], int]:
+        """(text, FAQ id, number of FAQs sharing it); a keyword wins over an equal question."""
+        count = self._shared.get(key)
+        if count:
+            return key, None, count
+        faq = self._questions[key][0]
+        return faq.question, faq.id, 1
+
+    def _build_table(self):
+        weights = np.array(self._weights, dtype=np.int64)
+
+        # _table[j][i] is the position of the heaviest of weights[i:i + 2**j],
+        # the leftmost on ties.
+        table = [np.arange(len(weights), dtype=np.int32)]
+        span = 1
+        while 2 * span <= len(weights):
+            previous = table[-1]
+            left, right = previous[:-span], previous[span:]
+            table.append(np.where(weights[left] >= weights[right], left, right))
+            span *= 2
+        self._table = table
+
+    def updated(self, previous: FAQIndex, index: FAQIndex) -> "Suggester":
+        """Return the suggester for ``index``, given that this one was built for ``previous``.
+
+        FAQs are compared by record identity, as :meth:`FAQIndex.updated`
+        shares unchanged records; the completions of the others are patched
+        into copies of the sorted arrays by bisection and only the range
+        table is rebuilt. This suggester is left untouched.
+        """
+        before = dict(zip(map(id, previous), previous))
+        after = dict(zip(map(id, index), index))
+        removed = [before[key] for key in before.keys() - after.keys()]
+        added = [after[key] for key in after.keys() - before.keys()]
+        if len(removed) + len(added) > len(index) * self.MAX_PATCHED_FRACTION:
+            return Suggester(index)
+
+        suggester = object.__new__(Suggester)
+        suggester._shared = dict(self._shared)
+        suggester._questions = questions = dict(self._questions)
+        changed = set()
+        for faq in removed:
+            changed.update(suggester._remove(faq))
+        for faq in added:
+            changed.update(suggester._add(faq))
+        # The first FAQ asking a question opens it. Unless the kept FAQs were
+        # reordered, only questions with a new asker can have a new first one.
+        if list(filter(after.__contains__, before)) != list(filter(before.__contains__, after)):
+            repeated = [key for key, owners in questions.items() if len(owners) > 1]
+        else:
+            repeated = [key for key in changed if len(questions.get(key, ())) > 1]
+        if repeated:
+            positions = dict(zip(after, range(len(after))))
+            for key in repeated:
+                owners = tuple(sorted(questions[key], key=lambda faq: positions[id(faq)]))
+                if owners[0] is not questions[key][0]:
+                    changed.add(key)
+                questions[key] = owners
+
+        keys, entries, weights = list(self._keys), list(self._entries), list(self._weights)
+        for key in sorted(changed):
+            i = bisect_left(keys, key)
+            present = i < len(keys) and keys[i] == key
+            if key in suggester._shared or key in questions:
+                entry = suggester._entry(key)
+                if present:
+                    entries[i], weights[i] = entry, _weight(key, entry[2])
+                else:
+                    keys.insert(i, key)
+                    entries.insert(i, entry)
+                    weights.insert(i, _weight(key, entry[2]))
+            elif present:
+                del keys[i], entries[i], weights[i]
+        suggester._keys, suggester._entries, suggester._weights = keys, entries, weights
+        suggester._build_table()
+        return suggester
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _heaviest(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        row = self._table[level]
+        left, right = int(row[lo]), int(row[hi - (1 << level)])
+        return left if self._weights[left] >= self._weights[right] else right
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Suggestion]:
+        """Return up to ``limit`` completions of ``prefix``, heaviest first.
+
+        A trailing space is kept, so "nav " completes whole words only.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        if prefix[-1:].isspace():
+            key += " "
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + _MAX, lo)
+        if lo == hi:
+            return []
+
+        weights = self._weights
+        best = self._heaviest(lo, hi)
+        heap = [(-weights[best], best, lo, hi)]
+        results: List[Suggestion] = []
+        while heap and len(results) < limit:
+            _, i, lo, hi = heappop(heap)
+            results.append(Suggestion(*self._entries[i][:2]))
+            if lo < i:
+                best = self._heaviest(lo, i)
+                heappush(heap, (-weights[best], best, lo, i))
+            if i + 1 < hi:
+                best = self._heaviest(i + 1, hi)
+                heappush(heap, (-weights[best], best, i + 1, hi))
+        return results
+
+
+@lru_cache(maxsize=2)
+def get_suggester(index: FAQIndex) -> Suggester:
+    """Return the (cached) suggester for an index.
+
+    After a reload it is patched from the suggester built last, so only
+    the changed FAQs' completions are re-sorted.
+    """
+    global _latest
+    with _build_lock:
+        suggester = _latest[1].updated(_latest[0], index) if _latest else Suggester(index)
+        _latest = index, suggester
+    return suggester
@@ -0,0 +1,77 @@
+"""
+Mutual Fund FAQ Assistant - Tokenizer
+Unicode-aware normalization, word tokenization and interned token ids.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Sequence
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+# Joins the texts given to normalize_all; NUL is neither a word character nor
+# whitespace, so nothing is merged across it.
+_SEPARATOR = "\x00"
+_PUNCTUATION_BUT_SEPARATOR = re.compile(r"[^\w\s\x00]+")
+
+
+def normalize(text: str) -> str:
+    """Normalize a query or keyword for matching.
+
+    Applies NFKC and case folding, turns punctuation into spaces and
+    collapses whitespace, so "ELSS  lock-in?" and "elss lock in" match (and
+    cache) identically.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def normalize_all(texts: Sequence[str]) -> List[str]:
+    """:func:`normalize` of every text, done in one pass over all of them."""
+    joined = _SEPARATOR.join(texts)
+    if joined.count(_SEPARATOR) != len(texts) - 1:
+        return [normalize(text) for text in texts]
+    joined = unicodedata.normalize("NFKC", joined).casefold()
+    joined = _WHITESPACE.sub(" ", _PUNCTUATION_BUT_SEPARATOR.sub(" ", joined))
+    return [text.strip() for text in joined.split(_SEPARATOR)]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized word tokens."""
+    return normalize(text).split()
+
+
+class Vocabulary:
+    """Interns tokens as small integer ids.
+
+    Ids are assigned while indexing; lookups for tokens that were never
+    interned return -1 so queries cannot grow the table.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def intern(self, token: str) -> int:
+        """Return the id of ``token``, assigning a new one if needed."""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = self._ids[token] = len(self._tokens)
+            self._tokens.append(token)
+        return token_id
+
+    def get(self, token: str) -> int:
+        """Return the id of ``token``, or -1 if it was never interned."""
+        return self._ids.get(token, -1)
+
+    def encode(self, tokens: Iterable[str]) -> List[int]:
+        """Map tokens to ids without interning new ones."""
+        ids = self._ids
+        return [ids.get(token, -1) for token in tokens]
+
+    def token(self, token_id: int) -> str:
+        """Return the token for an id."""
+        return self._tokens[token_id]